@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.models import User
+
+ROLE_CLAIMS = ("role", "is_staff", "is_superuser")
+
+
+def token_for_user(user):
+    token = RefreshToken.for_user(user)
+    token["username"] = user.username
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def claims_key(user_id):
+    return f"auth:claims:{user_id}"
+
+
+def current_claims(user_id):
+    # Короткоживущая проверка: роль из токена сверяется с БД не чаще
+    # одного раза за AUTH_CLAIMS_TTL, сигналы User сбрасывают её сразу.
+    key = claims_key(user_id)
+    claims = cache.get(key)
+    if claims is None:
+        claims = User.objects.filter(pk=user_id, is_active=True).values_list(
+            *ROLE_CLAIMS
+        ).first() or ()
+        cache.set(key, claims, settings.AUTH_CLAIMS_TTL)
+    return tuple(claims)
+
+
+class ClaimsUser(TokenUser):
+    @property
+    def role(self):
+        return self.token["role"]
+
+    @property
+    def is_admin(self):
+        return self.is_staff or self.role == User.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    # Для чтения пользователь собирается из утверждений токена без
+    # запроса к БД. Для записи нужен настоящий User: его сохраняют
+    # автором отзывов и комментариев.
+    def authenticate(self, request):
+        self.stateless = request.method in permissions.SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        token_claims = tuple(
+            validated_token.get(claim) for claim in ROLE_CLAIMS
+        )
+        if (not self.stateless or "username" not in validated_token
+                or None in token_claims):
+            return super().get_user(validated_token)
+        claims = current_claims(validated_token[api_settings.USER_ID_CLAIM])
+        if not claims:
+            raise AuthenticationFailed(
+                "User not found", code="user_not_found"
+            )
+        if claims != token_claims:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
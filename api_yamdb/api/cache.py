@@ -0,0 +1,83 @@
+import hashlib
+import time
+from itertools import chain, islice
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import urlencode
+
+CATALOG_VERSIONS = ("reviews.genre", "reviews.category", "reviews.title")
+
+
+def local_cache_warning():
+    # LocMemCache живёт внутри процесса: команда manage.py меняет
+    # только свою копию кэша, и веб-воркеры её изменений не видят.
+    backend = caches["default"]
+    if isinstance(backend, (LocMemCache, DummyCache)):
+        return (
+            f"{type(backend).__name__} не общий для процессов: веб-воркеры "
+            "не увидят изменений кэша. Задайте общий CACHE_BACKEND, "
+            "например Memcached."
+        )
+    return None
+
+
+def get_versions(*names):
+    # Версии хранятся без срока жизни. Если версию вытеснили, новая
+    # берётся из времени и не совпадает ни с одной из прежних.
+    keys = [f"version:{name}" for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key, time.time_ns())
+    return ":".join(str(versions[key]) for key in keys)
+
+
+def bump_version(name):
+    key = f"version:{name}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate_catalog(title_ids=(), review_ids=(), chunk_size=1000):
+    # Для массовых загрузок и пересчётов мимо сигналов. Версии
+    # отдельных произведений и отзывов удаляются пачками: при следующем
+    # чтении новая версия берётся из времени.
+    for name in CATALOG_VERSIONS:
+        bump_version(name)
+    keys = chain(
+        (f"version:{title_name(pk)}" for pk in title_ids),
+        (f"version:{review_name(pk)}" for pk in review_ids),
+    )
+    chunk = list(islice(keys, chunk_size))
+    while chunk:
+        cache.delete_many(chunk)
+        chunk = list(islice(keys, chunk_size))
+
+
+def response_key(request, *names):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f"{request.build_absolute_uri(request.path)}?{query}"
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f"response:{names[0]}:{get_versions(*names)}:{digest}"
+
+
+def title_name(pk):
+    return f"reviews.title:{pk}"
+
+
+def review_name(pk):
+    return f"reviews.review:{pk}"
+
+
+def title_key(pk):
+    # Вложенные жанры и категория входят в ответ, поэтому ключ зависит
+    # и от их версий.
+    versions = get_versions(
+        title_name(pk), "reviews.genre", "reviews.category"
+    )
+    return f"response:{title_name(pk)}:{versions}"
@@ -1,13 +1,85 @@
 import django_filters as filters
-from reviews.models import Title
+from django.db.models import F
+from rest_framework.filters import OrderingFilter
+from reviews import search
+from reviews.models import Category, Genre, Review, Title
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    pass
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    # Списки slug разбираются через запятую. Жанры и категории
+    # фильтруются подзапросами по id, без JOIN и DISTINCT: произведение
+    # с несколькими подходящими жанрами попадает в выдачу один раз.
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
     name = filters.CharFilter(field_name="name", lookup_expr='icontains')
     year = filters.NumberFilter(field_name='year')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(method='filter_rating_min')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'name', 'year', 'year_min',
+                  'year_max', 'rating_min', 'search')
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category_id__in=Category.objects.filter(
+            slug__in=value
+        ).values('pk'))
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(pk__in=Title.genre.through.objects.filter(
+            genre_id__in=Genre.objects.filter(slug__in=value).values('pk')
+        ).values('title_id'))
+
+    def filter_rating_min(self, queryset, name, value):
+        # Сравнивается точная средняя оценка; у произведений без отзывов
+        # rating NULL, и они не проходят фильтр.
+        return queryset.filter(rating__gte=value)
+
+    def filter_search(self, queryset, name, value):
+        return search.search(queryset, 'title', value)
+
+
+class ReviewSearchFilter(filters.FilterSet):
+    search = filters.CharFilter(method='filter_search')
+
+    class Meta:
+        model = Review
+        fields = ('search',)
+
+    def filter_search(self, queryset, name, value):
+        return search.search(queryset, 'review', value)
+
+
+class StableOrderingFilter(OrderingFilter):
+    # id в конце делает порядок однозначным для постраничной выдачи.
+    # Поля из `nulls_last_fields` представления сортируются с NULL
+    # в конце в обе стороны.
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {'id', '-id'} & set(ordering):
+            ordering = [*ordering, '-id' if ordering[0][0] == '-' else 'id']
+        return ordering
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        nulls_last = getattr(view, 'nulls_last_fields', ())
+        return queryset.order_by(*(
+            self.nulls_last(field) if field.lstrip('-') in nulls_last
+            else field
+            for field in ordering
+        ))
+
+    @staticmethod
+    def nulls_last(field):
+        if field.startswith('-'):
+            return F(field[1:]).desc(nulls_last=True)
+        return F(field).asc(nulls_last=True)
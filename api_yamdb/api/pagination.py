@@ -0,0 +1,150 @@
+import hashlib
+from base64 import b64decode, b64encode
+from binascii import Error as DecodeError
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CountedLimitOffsetPagination(LimitOffsetPagination):
+    # count берётся из денормализованного счётчика, если представление
+    # его предоставляет (get_stored_count). ?count=approx отдаёт число
+    # из кэша на PAGINATION_COUNT_TTL секунд, ?count=false не считает.
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = request.query_params.get(self.count_query_param)
+        self.view = view
+        if self.count_mode != "false":
+            return super().paginate_queryset(queryset, request, view)
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.count = None
+        self.request = request
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        return page[:self.limit]
+
+    def get_count(self, queryset):
+        get_stored_count = getattr(self.view, "get_stored_count", None)
+        count = get_stored_count() if get_stored_count else None
+        if count is not None:
+            return count
+        if self.count_mode != "approx":
+            return super().get_count(queryset)
+        key = "count:" + hashlib.md5(str(queryset.query).encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = super().get_count(queryset)
+            cache.set(key, count, settings.PAGINATION_COUNT_TTL)
+        return count
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(self, data):
+        if self.count is not None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+
+class PubDateCursorPagination(CountedLimitOffsetPagination):
+    # По умолчанию limit/offset. С параметром `cursor` страницы
+    # выбираются по ключу (pub_date, id) без OFFSET и COUNT(*).
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Неверный курсор"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request) or self.default_limit
+        position = self.decode_cursor(request)
+        reverse = bool(position and position[2])
+        if position is None:
+            queryset = queryset.order_by("-pub_date", "-pk")
+        elif reverse:
+            pub_date, pk, _ = position
+            queryset = queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            ).order_by("pub_date", "pk")
+        else:
+            pub_date, pk, _ = position
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            ).order_by("-pub_date", "-pk")
+
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+        self.next_position = (
+            (page[-1].pub_date, page[-1].pk, False)
+            if page and has_next else None
+        )
+        self.previous_position = (
+            (page[0].pub_date, page[0].pk, True)
+            if page and has_previous else None
+        )
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ("next", self.encode_cursor(self.next_position)),
+            ("previous", self.encode_cursor(self.previous_position)),
+            ("results", data),
+        ]))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            pub_date, pk, reverse = b64decode(
+                encoded.encode("ascii"), altchars=b"-_", validate=True
+            ).decode("ascii").split("|")
+            position = (parse_datetime(pub_date), int(pk), reverse == "1")
+        except (DecodeError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        if position is None:
+            return None
+        pub_date, pk, reverse = position
+        encoded = b64encode(
+            f"{pub_date.isoformat()}|{pk}|{int(reverse)}".encode("ascii"),
+            altchars=b"-_",
+        ).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
@@ -1,5 +1,6 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
 from reviews.models import Category, Comments, Genre, Review, Title, User
 
 
@@ -27,19 +28,38 @@ class SignUpSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Нельзя создать пользователя с никнеймом - "me"'
             )
-        if User.objects.filter(
-            username=username
-        ) and User.objects.get(username=username) != email:
-            raise serializers.ValidationError(
-                "Этот никнайм уже занят"
-            )
-        if User.objects.filter(
-            email=email
-        ) and User.objects.get(email=email) != username:
+        self.user = None
+        users = User.objects.filter(
+            Q(username=username) | Q(email=email)
+        ).order_by()
+        for user in users:
+            if user.username == username and user.email == email:
+                self.user = user
+            elif user.username == username:
+                raise serializers.ValidationError(
+                    "Этот никнайм уже занят"
+                )
+            else:
+                raise serializers.ValidationError(
+                    "Эта электронная почта уже используется"
+                )
+        return data
+
+    def create(self, validated_data):
+        if self.user is not None:
+            return self.user
+        # Параллельная регистрация могла успеть создать пользователя
+        # после проверки: уникальные поля не дадут создать дубликат.
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            user = User.objects.filter(**validated_data).first()
+        if user is None:
             raise serializers.ValidationError(
-                "Эта электронная почта уже используется"
+                "Этот никнайм или электронная почта уже заняты"
             )
-        return data
+        return user
 
 
 class TokenSerializer(serializers.ModelSerializer):
@@ -64,14 +84,24 @@ class GenreSerializer(serializers.ModelSerializer):
 
 
 class TitleSerializer(serializers.ModelSerializer):
-    rating = serializers.IntegerField(read_only=True)
+    rating = serializers.SerializerMethodField()
+    score_histogram = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
 
     class Meta:
-        fields = "__all__"
+        fields = (
+            "id", "name", "year", "rating", "score_histogram", "description",
+            "genre", "category"
+        )
         model = Title
 
+    def get_rating(self, obj):
+        # В базе хранится точная средняя оценка, в API — её целая часть.
+        return None if obj.rating is None else int(obj.rating)
+
 
 class TitleCreateSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
@@ -82,7 +112,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = "__all__"
+        fields = ("id", "name", "year", "description", "genre", "category")
         model = Title
 
 
@@ -103,16 +133,12 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'author', 'title')
 
     def create(self, validated_data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        title_id = self.context['view'].kwargs.get('title_id')
-        if Review.objects.filter(
-                title=title,
-                author=author).exists():
+        # Повторный отзыв отсекает ограничение constraints_review,
+        # отдельная проверка перед вставкой не нужна.
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError('нельзя оставить отзыв дважды')
-        return Review.objects.create(**validated_data)
 
     def validate_score(self, value):
         if 0 >= value >= 10:
@@ -120,6 +146,13 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
 
+class ReviewSearchSerializer(ReviewSerializer):
+    title_id = serializers.IntegerField(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title_id',)
+
+
 class CommentsSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True,
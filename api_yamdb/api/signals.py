@@ -0,0 +1,98 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+from api.authentication import claims_key
+from api.cache import bump_version, review_name, title_name
+
+
+def bump_versions(names):
+    for name in names:
+        bump_version(name)
+
+
+def bump_on_commit(*names):
+    # Версии меняются после коммита: иначе параллельный GET успеет
+    # закэшировать старые строки под новой версией.
+    transaction.on_commit(partial(bump_versions, names))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def catalog_changed(sender, **kwargs):
+    bump_on_commit(sender._meta.label_lower)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    bump_on_commit(title_name(instance.pk), "reviews.title")
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith("post_"):
+        return
+    names = ["reviews.title"]
+    if not reverse:
+        names.append(title_name(instance.pk))
+    elif pk_set:
+        names += [title_name(pk) for pk in pk_set]
+    else:
+        names.append("reviews.genre")
+    bump_on_commit(*names)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    names = [review_name(instance.pk), title_name(instance.title_id),
+             "reviews.title"]
+    loaded_title_id, _ = getattr(instance, "_loaded_rating", (None, None))
+    if loaded_title_id not in (None, instance.title_id):
+        names.append(title_name(loaded_title_id))
+    bump_on_commit(*names)
+
+
+@receiver(post_save, sender=Comments)
+@receiver(post_delete, sender=Comments)
+def comment_changed(sender, instance, **kwargs):
+    bump_on_commit(review_name(instance.review_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    cache.delete(claims_key(instance.pk))
+
+
+@receiver(pre_save, sender=User)
+def user_renaming(sender, instance, raw, update_fields, **kwargs):
+    instance._renamed = not raw and instance.pk is not None and (
+        update_fields is None or "username" in update_fields
+    ) and User.objects.filter(pk=instance.pk).exclude(
+        username=instance.username
+    ).exists()
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, **kwargs):
+    # Отзывы и комментарии показывают имя автора, поэтому переименование
+    # меняет версии списков, где они выводятся.
+    if not getattr(instance, "_renamed", False):
+        return
+    title_ids = Review.objects.filter(author=instance).values_list(
+        "title_id", flat=True
+    )
+    review_ids = Comments.objects.filter(author=instance).values_list(
+        "review_id", flat=True
+    ).distinct()
+    bump_on_commit(*map(title_name, title_ids), *map(review_name, review_ids))
@@ -9,6 +9,7 @@ router.register('users', views.UserViewSet, 'users')
 router.register('genres', views.GenreViewSet, 'genres')
 router.register('titles', views.TitleViewSet, 'titles')
 router.register('categories', views.CategoryViewSet, 'categories')
+router.register('reviews', views.ReviewSearchViewSet, 'review-search')
 router.register(
     r'titles/(?P<title_id>\d+)/reviews',
     views.ReviewViewSet, 'reviews'
@@ -26,4 +27,5 @@ authentication = [
 urlpatterns = [
     path("v1/", include(router.urls)),
     path("v1/auth/", include(authentication)),
+    path("v1/export/<slug:table>/", views.export_catalog, name="export"),
 ]
@@ -1,32 +1,103 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.core.cache import cache
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews import autocomplete, leaderboards
+from reviews.export import CATALOG_TABLES, EXPORT_FORMATS, export_lines
+from reviews.models import (Category, Comments, Genre, Review, SimilarTitle,
+                            Title, User)
+from reviews.outbox import enqueue
 
 from api import serializers
-from api.filters import TitleFilter
+from api.authentication import token_for_user
+from api.cache import response_key, review_name, title_key, title_name
+from api.filters import (ReviewSearchFilter, StableOrderingFilter,
+                         TitleFilter)
+from api.pagination import (CountedLimitOffsetPagination,
+                            PubDateCursorPagination)
 from api.permissions import (IsAdmin, IsAdminOrReadOnlyAnonymusPermission,
                              IsAuthorOrAdminOrModerator)
 
 
+class ConditionalCacheMixin:
+    # ETag строится из ключа кэша: версии данных и URL запроса. Ответ
+    # 304 отдаётся до выполнения основного запроса к БД.
+    cache_timeouts = {}
+
+    def get_cache_key(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request,
+                                         *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key()
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        response = None
+        # `If-None-Match: *` совпал бы до проверки, что объект есть,
+        # и вместо 404 вернулся бы 304.
+        if request.META.get("HTTP_IF_NONE_MATCH", "").strip() != "*":
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.cached_response(key, handler, request,
+                                            *args, **kwargs)
+        response["ETag"] = etag
+        return response
+
+    def cached_response(self, key, handler, request, *args, **kwargs):
+        timeout = self.cache_timeouts.get(self.action)
+        if timeout is None:
+            return handler(request, *args, **kwargs)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        cache.set(key, response.data, timeout)
+        return response
+
+
+class ConditionalModelViewSet(ConditionalCacheMixin, viewsets.ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request,
+                                         *args, **kwargs)
+
+
+class NestedModelViewSet(ConditionalModelViewSet):
+    # Список фильтруется по id родителя из URL. Существование родителя
+    # проверяется, только если страница пуста: иначе он точно есть.
+    def get_parent(self):
+        raise NotImplementedError
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and not page:
+            self.get_parent()
+        return page
+
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = serializers.UserSerializer
     permission_classes = (permissions.IsAuthenticated, IsAdmin)
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountedLimitOffsetPagination
     lookup_field = "username"
 
     @action(methods=["patch", "get"], detail=False,
             permission_classes=(permissions.IsAuthenticated,))
     def me(self, request):
         user = self.request.user
+        if not isinstance(user, User):
+            user = get_object_or_404(User, pk=user.pk)
         if request.method == "GET":
             serializer = serializers.UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -39,65 +110,151 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(ConditionalModelViewSet):
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    ).order_by("id")
     serializer_class = serializers.TitleSerializer
+    # Как у вложенных маршрутов отзывов: нечисловой id не доходит до
+    # запросов по title_id и сразу даёт 404.
+    lookup_value_regex = r"\d+"
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAdminOrReadOnlyAnonymusPermission
     )
-    pagination_class = LimitOffsetPagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = CountedLimitOffsetPagination
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = (
+        "rating", "weighted_rating", "year", "reviews_count", "id"
+    )
+    nulls_last_fields = ("rating",)
+    cache_timeouts = {"retrieve": settings.TITLE_CACHE_TIMEOUT}
 
     def get_serializer_class(self):
         if self.action in ("create", "update", "partial_update"):
             return serializers.TitleCreateSerializer
         return serializers.TitleSerializer
 
-    def get_queryset(self):
-        return Title.objects.annotate(rating=Avg(
-            "reviews__score")).order_by("id")
+    @action(detail=False, permission_classes=(permissions.AllowAny,))
+    def autocomplete(self, request):
+        # Подсказки берутся из индекса в памяти процесса, без запросов к БД.
+        prefix = request.query_params.get("q", "")
+        return Response(autocomplete.suggest(prefix))
+
+    @action(detail=False, permission_classes=(permissions.AllowAny,))
+    def top(self, request):
+        # id лучших произведений берутся из таблицы лидеров в кэше,
+        # сами произведения — одной выборкой по первичному ключу.
+        scope, slug = "all", None
+        for name in ("genre", "category"):
+            if request.query_params.get(name):
+                scope, slug = name, request.query_params[name]
+                break
+        bayesian = request.query_params.get("bayesian", "").lower() in (
+            "1", "true"
+        )
+        ids = leaderboards.get_board(scope, slug, bayesian)
+        titles = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in ids if pk in titles], many=True
+        )
+        return Response(serializer.data)
 
+    @action(detail=True, permission_classes=(permissions.AllowAny,))
+    def similar(self, request, pk=None):
+        # Соседи посчитаны заранее командой build_similar_titles.
+        # Существование произведения проверяется, только если их нет.
+        rows = SimilarTitle.objects.filter(title_id=pk).select_related(
+            "similar__category"
+        ).prefetch_related("similar__genre")
+        titles = [row.similar for row in rows]
+        if not titles:
+            get_object_or_404(Title, pk=pk)
+        return Response(self.get_serializer(titles, many=True).data)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_cache_key(self):
+        if self.action == "retrieve":
+            return title_key(self.kwargs["pk"])
+        return response_key(
+            self.request, "reviews.title", "reviews.genre", "reviews.category"
+        )
+
+
+class ReviewViewSet(NestedModelViewSet):
     serializer_class = serializers.ReviewSerializer
     permission_classes = (IsAuthorOrAdminOrModerator,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDateCursorPagination
+
+    def get_cache_key(self):
+        return response_key(
+            self.request, title_name(self.kwargs.get('title_id'))
+        )
+
+    def get_parent(self):
+        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+
+    def get_stored_count(self):
+        return Title.objects.filter(
+            pk=self.kwargs.get('title_id')
+        ).values_list('reviews_count', flat=True).first()
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author', 'title')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_parent())
+
+
+class ReviewSearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    # Поиск по тексту всех отзывов, `?search=` сортирует по релевантности.
+    queryset = Review.objects.select_related('author', 'title').order_by(
+        '-pub_date', '-pk'
+    )
+    serializer_class = serializers.ReviewSearchSerializer
+    permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    pagination_class = CountedLimitOffsetPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = ReviewSearchFilter
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(NestedModelViewSet):
     serializer_class = serializers.CommentsSerializer
     permission_classes = (IsAuthorOrAdminOrModerator,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDateCursorPagination
 
-    def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id'),
+    def get_cache_key(self):
+        return response_key(
+            self.request, review_name(self.kwargs.get('review_id'))
         )
-        return review.comments.all()
 
-    def perform_create(self, serializer):
-        review = get_object_or_404(
+    def get_parent(self):
+        return get_object_or_404(
             Review,
             pk=self.kwargs.get('review_id'),
             title__id=self.kwargs.get('title_id'),
         )
-        serializer.save(author=self.request.user, review=review)
 
+    def get_stored_count(self):
+        return Review.objects.filter(
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        ).values_list('comments_count', flat=True).first()
 
-class GetMixin(mixins.ListModelMixin,
+    def get_queryset(self):
+        return Comments.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author')
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user, review=self.get_parent())
+
+
+class GetMixin(ConditionalCacheMixin,
+               mixins.ListModelMixin,
                mixins.CreateModelMixin,
                mixins.DestroyModelMixin,
                viewsets.GenericViewSet):
@@ -106,8 +263,14 @@ class GetMixin(mixins.ListModelMixin,
     filterset_fields = ('name',)
     search_fields = ('name',)
     lookup_field = 'slug'
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountedLimitOffsetPagination
     permission_classes = (IsAdminOrReadOnlyAnonymusPermission,)
+    cache_timeouts = {"list": settings.CATALOG_CACHE_TIMEOUT}
+
+    def get_cache_key(self):
+        return response_key(
+            self.request, self.queryset.model._meta.label_lower
+        )
 
 
 class GenreViewSet(GetMixin):
@@ -125,15 +288,13 @@ class CategoryViewSet(GetMixin):
 def get_signup(request):
     serializer = serializers.SignUpSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    username = request.data.get("username")
-    email = request.data.get("email")
-    user, created = User.objects.get_or_create(username=username, email=email)
+    user = serializer.save()
     confirmation_code = default_token_generator.make_token(user)
 
-    send_mail("Код подтверждения,",
-              f"Ваш код подтверждения: {confirmation_code}",
-              "valid_email@yamdb.fake",
-              (email,))
+    enqueue("Код подтверждения,",
+            f"Ваш код подтверждения: {confirmation_code}",
+            "valid_email@yamdb.fake",
+            user.email)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -147,9 +308,27 @@ def get_token(request):
     user = get_object_or_404(User, username=username)
 
     if default_token_generator.check_token(user, confirmation_code):
-        token = RefreshToken.for_user(user)
+        token = token_for_user(user)
         return Response({f"token: {token}"}, status=status.HTTP_200_OK)
     return Response(
         {"WRONG CODE": "Неверный код подтверждения"},
         status=status.HTTP_400_BAD_REQUEST
     )
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+def export_catalog(request, table):
+    export_format = request.query_params.get("type", "csv")
+    if table not in CATALOG_TABLES or export_format not in EXPORT_FORMATS:
+        raise Http404
+    response = StreamingHttpResponse(
+        export_lines(table, export_format),
+        content_type=(
+            "text/csv" if export_format == "csv" else "application/x-ndjson"
+        ),
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{table}.{export_format}"'
+    )
+    return response
@@ -63,6 +63,31 @@ DATABASES = {
     }
 }
 
+# LocMemCache подходит только для одного процесса. С несколькими
+# воркерами и для команд, которые пишут в кэш (import_csv,
+# rebuild_ratings, rebuild_leaderboards, recompute_weighted_ratings),
+# нужен общий CACHE_BACKEND.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='api_yamdb'),
+    }
+}
+
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', default=3600))
+TITLE_CACHE_TIMEOUT = int(os.getenv('TITLE_CACHE_TIMEOUT', default=600))
+PAGINATION_COUNT_TTL = int(os.getenv('PAGINATION_COUNT_TTL', default=60))
+# Конфигурация to_tsvector для полнотекстового поиска в PostgreSQL.
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', default='russian')
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', default=10))
+LEADERBOARD_CACHE_TIMEOUT = int(os.getenv('LEADERBOARD_CACHE_TIMEOUT', default=3600))
+# 0 — вес равен среднему числу отзывов у произведения.
+LEADERBOARD_PRIOR_WEIGHT = float(os.getenv('LEADERBOARD_PRIOR_WEIGHT', default=0))
+SIMILAR_TITLES_K = int(os.getenv('SIMILAR_TITLES_K', default=10))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -98,7 +123,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
@@ -109,7 +134,15 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',)
 }
 
+AUTH_CLAIMS_TTL = int(os.getenv('AUTH_CLAIMS_TTL', default=60))
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+# eager - отправка сразу после коммита, thread - в фоновом потоке,
+# повторы после ошибок планируются в том же процессе, worker - только
+# командой `manage.py send_outbox --loop`.
+EMAIL_OUTBOX_MODE = os.getenv('EMAIL_OUTBOX_MODE', default='thread')
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
 
 VALUE_DISPLAY = '-Empty-'
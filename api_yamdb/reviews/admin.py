@@ -1,7 +1,8 @@
 from api_yamdb.settings import VALUE_DISPLAY
 from django.contrib import admin
 
-from reviews.models import Category, Comments, Genre, Review, Title, User
+from reviews.models import (Category, Comments, Genre, OutgoingEmail, Review,
+                            Title, User)
 
 
 @admin.register(Review)
@@ -38,7 +39,11 @@ class GenreAdmin(admin.ModelAdmin):
 
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('name', 'year', 'description', 'category',)
+    list_display = ('name', 'year', 'description', 'category',
+                    'reviews_count', 'rating',)
+    readonly_fields = ('rating_sum', 'reviews_count', 'rating',
+                       'weighted_rating', 'rating_low', 'rating_high',
+                       'score_histogram',)
     search_fields = ('name', 'description',)
     list_filter = ('year', 'genre', 'category',)
 
@@ -47,3 +52,11 @@ class TitleAdmin(admin.ModelAdmin):
 class UserAdmin(admin.ModelAdmin):
     list_display = ('id', 'role', 'username', 'email',
                     'bio', 'first_name', 'last_name',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'subject', 'created', 'attempts',
+                    'sent_at',)
+    search_fields = ('recipient',)
+    list_filter = ('sent_at',)
@@ -0,0 +1,72 @@
+import re
+import threading
+from bisect import bisect_left
+
+from api.cache import bump_version, get_versions
+
+from reviews.models import Title
+
+# Индекс живёт в памяти процесса: отсортированный список ключей
+# (название в casefold с начала каждого слова, id). Изменения названий
+# меняют общую версию в кэше, и каждый процесс перечитывает индекс при
+# следующем запросе, увидев новую версию. Поэтому с несколькими
+# воркерами нужен общий CACHE_BACKEND.
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_VERSION = 'reviews.autocomplete'
+WORD_START = re.compile(r'\w+')
+
+lock = threading.Lock()
+entries = []
+names = {}
+loaded_version = None
+
+
+def keys(name):
+    folded = name.casefold()
+    return {folded[match.start():] for match in WORD_START.finditer(folded)}
+
+
+def load(version):
+    global loaded_version
+    # Версия читается до выборки: изменение, закоммиченное после неё,
+    # сменит версию ещё раз и вызовет новую загрузку.
+    rows = Title.objects.values_list('pk', 'name')
+    with lock:
+        names.clear()
+        entries.clear()
+        for pk, name in rows.iterator():
+            names[pk] = name
+            entries.extend((key, pk) for key in keys(name))
+        entries.sort()
+        loaded_version = version
+
+
+def reset():
+    global loaded_version
+    with lock:
+        names.clear()
+        entries.clear()
+        loaded_version = None
+
+
+def invalidate():
+    bump_version(AUTOCOMPLETE_VERSION)
+
+
+def suggest(prefix, limit=AUTOCOMPLETE_LIMIT):
+    prefix = prefix.strip().casefold()
+    if not prefix:
+        return []
+    version = get_versions(AUTOCOMPLETE_VERSION)
+    if version != loaded_version:
+        load(version)
+    found = {}
+    with lock:
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and len(found) < limit:
+            key, pk = entries[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(pk, names[pk])
+            position += 1
+    return [{'id': pk, 'name': name} for pk, name in found.items()]
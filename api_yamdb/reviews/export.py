@@ -0,0 +1,60 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Category, Comments, Genre, Review, Title
+
+# Колонки совпадают с файлами static/data, чтобы выгрузку можно было
+# снова загрузить через `manage.py import_csv`.
+CATALOG_TABLES = {
+    'category': (Category, (('id', 'id'), ('name', 'name'),
+                            ('slug', 'slug'))),
+    'genre': (Genre, (('id', 'id'), ('name', 'name'), ('slug', 'slug'))),
+    'titles': (Title, (('id', 'id'), ('name', 'name'), ('year', 'year'),
+                       ('category', 'category_id'))),
+    'genre_title': (Title.genre.through, (('id', 'id'),
+                                          ('title_id', 'title_id'),
+                                          ('genre_id', 'genre_id'))),
+    'review': (Review, (('id', 'id'), ('title_id', 'title_id'),
+                        ('text', 'text'), ('author', 'author_id'),
+                        ('score', 'score'), ('pub_date', 'pub_date'))),
+    'comments': (Comments, (('id', 'id'), ('review_id', 'review_id'),
+                            ('text', 'text'), ('author', 'author_id'),
+                            ('pub_date', 'pub_date'))),
+}
+EXPORT_FORMATS = ('csv', 'jsonl')
+CHUNK_SIZE = 2000
+
+encoder = DjangoJSONEncoder()
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_rows(table, chunk_size=CHUNK_SIZE):
+    model, columns = CATALOG_TABLES[table]
+    fields = [field for _, field in columns]
+    rows = model.objects.order_by('pk').values_list(*fields)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield [
+            value if isinstance(value, (str, int)) or value is None
+            else encoder.default(value)
+            for value in row
+        ]
+
+
+def export_lines(table, export_format='csv', chunk_size=CHUNK_SIZE):
+    _, columns = CATALOG_TABLES[table]
+    header = [column for column, _ in columns]
+    if export_format == 'jsonl':
+        for row in export_rows(table, chunk_size):
+            yield json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n'
+        return
+    writer = csv.writer(Echo(), lineterminator='\n')
+    yield writer.writerow(header)
+    for row in export_rows(table, chunk_size):
+        yield writer.writerow(['' if value is None else value
+                               for value in row])
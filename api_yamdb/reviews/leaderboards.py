@@ -0,0 +1,83 @@
+from api.cache import bump_version, get_versions
+from django.conf import settings
+from django.core.cache import cache
+
+from reviews.models import Category, Genre, Title
+
+# Таблица лидеров хранит в кэше id лучших произведений. Запись отзыва
+# удаляет только таблицы его произведения: общую, категории и жанров.
+# Изменение произведений, жанров или категорий сбрасывает все таблицы
+# через версию. Пересчёт идёт при следующем чтении или командой
+# `rebuild_leaderboards`. Байесовские таблицы сортируются по
+# сохранённому weighted_rating и меняются после
+# `recompute_weighted_ratings`.
+LEADERBOARD_VERSION = 'reviews.leaderboard'
+
+
+def top_titles(scope='all', slug=None, bayesian=False, size=None):
+    titles = Title.objects.filter(reviews_count__gt=0)
+    if scope == 'genre':
+        titles = titles.filter(pk__in=Title.genre.through.objects.filter(
+            genre_id__in=Genre.objects.filter(slug=slug).values('pk')
+        ).values('title_id'))
+    elif scope == 'category':
+        titles = titles.filter(category_id__in=Category.objects.filter(
+            slug=slug
+        ).values('pk'))
+    if bayesian:
+        titles = titles.order_by('-weighted_rating', '-reviews_count', '-id')
+    else:
+        titles = titles.order_by('-rating', '-reviews_count', '-id')
+    return titles[:size or settings.LEADERBOARD_SIZE]
+
+
+def board_key(scope, slug, bayesian, version=None):
+    version = version or get_versions(LEADERBOARD_VERSION)
+    mode = 'bayesian' if bayesian else 'rating'
+    return f'leaderboard:{version}:{mode}:{scope}:{slug or ""}'
+
+
+def get_board(scope='all', slug=None, bayesian=False):
+    key = board_key(scope, slug, bayesian)
+    ids = cache.get(key)
+    if ids is None:
+        ids = store_board(key, scope, slug, bayesian)
+    return ids
+
+
+def store_board(key, scope, slug, bayesian):
+    ids = list(top_titles(scope, slug, bayesian).values_list('pk', flat=True))
+    cache.set(key, ids, settings.LEADERBOARD_CACHE_TIMEOUT)
+    return ids
+
+
+def rebuild():
+    boards = [('all', None)]
+    boards += [('genre', slug)
+               for slug in Genre.objects.values_list('slug', flat=True)]
+    boards += [('category', slug)
+               for slug in Category.objects.values_list('slug', flat=True)]
+    version = get_versions(LEADERBOARD_VERSION)
+    for scope, slug in boards:
+        for bayesian in (False, True):
+            store_board(board_key(scope, slug, bayesian, version),
+                        scope, slug, bayesian)
+    return len(boards) * 2
+
+
+def invalidate_title(pk):
+    boards = [('all', None)]
+    for category, genre in Title.objects.filter(pk=pk).values_list(
+        'category__slug', 'genre__slug'
+    ):
+        boards += [('category', category), ('genre', genre)]
+    version = get_versions(LEADERBOARD_VERSION)
+    cache.delete_many({
+        board_key(scope, slug, bayesian, version)
+        for scope, slug in boards if scope == 'all' or slug
+        for bayesian in (False, True)
+    })
+
+
+def invalidate_all():
+    bump_version(LEADERBOARD_VERSION)
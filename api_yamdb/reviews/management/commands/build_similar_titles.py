@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews import similar
+
+
+class Command(BaseCommand):
+    help = 'Строит таблицу похожих произведений по оценкам пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--method', choices=similar.SIMILARITY_METHODS,
+            default='adjusted',
+            help='adjusted — косинус оценок за вычетом средней '
+                 'пользователя, cosine — косинус исходных оценок',
+        )
+        parser.add_argument(
+            '--top-k', type=int, default=settings.SIMILAR_TITLES_K,
+            help='Число соседей у произведения',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=similar.CHUNK_SIZE,
+            help='Число произведений в одном запросе соседей и одной вставке',
+        )
+
+    def handle(self, *args, **options):
+        if options['top_k'] < 1 or options['chunk_size'] < 1:
+            raise CommandError(
+                '--top-k и --chunk-size должны быть больше нуля'
+            )
+        started = time.monotonic()
+        created = similar.build(
+            options['method'], options['top_k'], options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено пар похожих произведений: {created} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
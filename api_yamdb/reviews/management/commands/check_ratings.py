@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from reviews.models import SCORE_FIELDS, Review, Title, stored_rating
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет сохранённые сумму оценок, число отзывов и гистограмму '
+        'оценок произведений и число комментариев отзывов '
+        'с фактическими данными'
+    )
+
+    def handle(self, *args, **options):
+        # NULL рейтинга без отзывов сравнивается через Coalesce.
+        drifted_titles = Title.objects.with_actual_rating().annotate(
+            current_rating=Coalesce('rating', -1.0),
+            expected_rating=Coalesce(
+                stored_rating(F('rating_sum'), F('reviews_count')), -1.0
+            ),
+        ).exclude(
+            rating_sum=F('actual_rating_sum'),
+            reviews_count=F('actual_reviews_count'),
+            current_rating=F('expected_rating'),
+            **{field: F(f'actual_{field}') for field in SCORE_FIELDS},
+        ).order_by('pk')
+        found = 0
+        for title in drifted_titles.iterator():
+            found += 1
+            self.stdout.write(
+                f'{title.pk} {title.name}: '
+                f'сумма {title.rating_sum} -> {title.actual_rating_sum}, '
+                f'отзывов {title.reviews_count} -> '
+                f'{title.actual_reviews_count}, рейтинг {title.rating}, '
+                f'гистограмма {title.score_histogram} -> ' + str([
+                    getattr(title, f'actual_{field}')
+                    for field in SCORE_FIELDS
+                ])
+            )
+        drifted_reviews = Review.objects.with_actual_comments_count().exclude(
+            comments_count=F('actual_comments_count'),
+        ).order_by('pk')
+        for review in drifted_reviews.iterator():
+            found += 1
+            self.stdout.write(
+                f'отзыв {review.pk}: комментариев {review.comments_count} -> '
+                f'{review.actual_comments_count}'
+            )
+        if found:
+            raise CommandError(
+                f'Найдено расхождений: {found}. '
+                'Запустите `manage.py rebuild_ratings`.'
+            )
+        self.stdout.write(self.style.SUCCESS('Расхождений нет'))
@@ -0,0 +1,44 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import (CATALOG_TABLES, CHUNK_SIZE, EXPORT_FORMATS,
+                            export_lines)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает каталог в CSV или JSONL в формате static/data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Каталог для файлов выгрузки')
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='csv',
+        )
+        parser.add_argument(
+            '--tables', nargs='+', choices=tuple(CATALOG_TABLES),
+            default=tuple(CATALOG_TABLES),
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Число строк, читаемых из БД за раз',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля')
+        os.makedirs(options['output'], exist_ok=True)
+        export_format = options['export_format']
+        for table in options['tables']:
+            path = os.path.join(
+                options['output'], f'{table}.{export_format}'
+            )
+            started = time.monotonic()
+            with open(path, 'w', encoding='utf-8', newline='') as dump:
+                dump.writelines(export_lines(
+                    table, export_format, options['chunk_size']
+                ))
+            self.stdout.write(self.style.SUCCESS(
+                f'{table}: {path} за {time.monotonic() - started:.2f} с'
+            ))
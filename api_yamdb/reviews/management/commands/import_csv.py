@@ -0,0 +1,138 @@
+import csv
+import os
+import time
+from contextlib import contextmanager
+from functools import partial
+
+from api.cache import invalidate_catalog, local_cache_warning
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+
+from reviews import autocomplete, leaderboards, search
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+# Файлы в порядке зависимостей: внешние ключи ссылаются только на уже
+# загруженные таблицы. Переименования приводят колонки CSV к полям модели.
+CSV_TABLES = (
+    ('users', User, {}),
+    ('category', Category, {}),
+    ('genre', Genre, {}),
+    ('titles', Title, {'category': 'category_id'}),
+    ('genre_title', Title.genre.through, {}),
+    ('review', Review, {'author': 'author_id'}),
+    ('comments', Comments, {'author': 'author_id'}),
+)
+
+
+def invalidate_caches(model):
+    title_ids = review_ids = ()
+    if model in (Title, Title.genre.through, Review, Comments):
+        title_ids = Title.objects.values_list('pk', flat=True).iterator()
+    if model is Comments:
+        review_ids = Review.objects.values_list('pk', flat=True).iterator()
+    invalidate_catalog(title_ids, review_ids)
+    leaderboards.invalidate_all()
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Загружает CSV из static/data пакетными вставками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV файлами',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Число строк в одной вставке',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        warning = local_cache_warning()
+        if warning:
+            self.stderr.write(self.style.WARNING(warning))
+        self.password = make_password(None)
+        for name, model, columns in CSV_TABLES:
+            path = os.path.join(options['path'], f'{name}.csv')
+            if not os.path.exists(path):
+                self.stdout.write(f'{name}.csv не найден, пропускаем')
+                continue
+            started = time.monotonic()
+            try:
+                with transaction.atomic():
+                    loaded = self.load(
+                        path, model, columns, options['batch_size']
+                    )
+                    self.after_load(model)
+            except IntegrityError as error:
+                raise CommandError(f'{name}.csv: {error}')
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: {loaded} строк, {loaded / elapsed:.0f} строк/с'
+            ))
+
+    def load(self, path, model, columns, batch_size):
+        loaded = 0
+        batch = []
+        with open(path, encoding='utf-8', newline='') as csv_file, \
+                keep_auto_now_add(model):
+            for row in csv.DictReader(csv_file):
+                batch.append(self.build(model, row, columns))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_create(batch)
+                    loaded += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_create(batch)
+                loaded += len(batch)
+        return loaded
+
+    def build(self, model, row, columns):
+        values = {}
+        for column, value in row.items():
+            field = columns.get(column, column)
+            if value == '' and field.endswith('_id'):
+                value = None
+            values[field] = value
+        if model is User:
+            values['password'] = self.password
+        return model(**values)
+
+    def after_load(self, model):
+        # bulk_create не отправляет сигналы, поэтому счётчики
+        # и поисковый индекс пересчитываются одним запросом на таблицу,
+        # а кэш ответов и таблицы лидеров сбрасываются после коммита.
+        if model in (Title, Review):
+            search.rebuild(model._meta.model_name)
+        if model is Title:
+            transaction.on_commit(autocomplete.invalidate)
+        if model is Review:
+            Title.objects.refresh_rating()
+        if model is Comments:
+            Review.objects.refresh_comments_count()
+        transaction.on_commit(partial(invalidate_caches, model))
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
@@ -0,0 +1,20 @@
+from api.cache import local_cache_warning
+from django.core.management.base import BaseCommand
+
+from reviews import leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает таблицы лидеров и сохраняет их в кэш. Веб-воркеры '
+        'увидят их только с общим CACHE_BACKEND'
+    )
+
+    def handle(self, *args, **options):
+        warning = local_cache_warning()
+        if warning:
+            self.stderr.write(self.style.WARNING(warning))
+        boards = leaderboards.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано таблиц лидеров: {boards}'
+        ))
@@ -0,0 +1,32 @@
+from api.cache import invalidate_catalog, local_cache_warning
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews import leaderboards
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сумму оценок, число отзывов и гистограмму оценок '
+        'всех произведений и число комментариев всех отзывов'
+    )
+
+    def handle(self, *args, **options):
+        warning = local_cache_warning()
+        if warning:
+            self.stderr.write(self.style.WARNING(warning))
+        with transaction.atomic():
+            titles = Title.objects.refresh_rating()
+            reviews = Review.objects.refresh_comments_count()
+        # Пересчёт идёт мимо сигналов, поэтому кэш ответов и таблицы
+        # лидеров сбрасываются здесь.
+        invalidate_catalog(
+            Title.objects.values_list('pk', flat=True).iterator(),
+            Review.objects.values_list('pk', flat=True).iterator(),
+        )
+        leaderboards.invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитан рейтинг произведений: {titles}, '
+            f'число комментариев отзывов: {reviews}'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс произведений и отзывов'
+
+    def handle(self, *args, **options):
+        if not search.supported():
+            self.stdout.write('База данных не поддерживает полнотекстовый '
+                              'индекс, поиск работает через icontains')
+            return
+        with transaction.atomic():
+            for name in search.SEARCH_INDEXES:
+                search.create_index(name)
+                search.rebuild(name)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен'))
@@ -0,0 +1,33 @@
+import time
+
+from api.cache import local_cache_warning
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews import weighted
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает взвешенный рейтинг и доверительный интервал '
+        'оценок всех произведений. Кэш веб-воркеров сбрасывается только '
+        'с общим CACHE_BACKEND'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=weighted.CHUNK_SIZE,
+            help='Число строк в одной выборке и одном обновлении',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля')
+        warning = local_cache_warning()
+        if warning:
+            self.stderr.write(self.style.WARNING(warning))
+        started = time.monotonic()
+        titles = weighted.recompute(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено произведений: {titles} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
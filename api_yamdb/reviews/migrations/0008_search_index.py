@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from reviews import search
+
+
+def create_search_index(apps, schema_editor):
+    for name in search.SEARCH_INDEXES:
+        search.create_index(name, schema_editor.connection)
+        search.rebuild(name, schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    for name in search.SEARCH_INDEXES:
+        search.drop_index(name, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:23
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Coalesce, NullIf
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.update(rating=Coalesce(
+        F('rating_sum') / NullIf(F('reviews_count'), 0), 0,
+        output_field=models.PositiveSmallIntegerField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_year_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Рейтинг'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'year', 'reviews_count'], name='title_rating_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['reviews_count'], name='title_reviews_count_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_stored_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_high',
+            field=models.FloatField(default=0, editable=False, verbose_name='Верхняя граница рейтинга'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_low',
+            field=models.FloatField(default=0, editable=False, verbose_name='Нижняя граница рейтинга'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(default=0, editable=False, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['weighted_rating', 'reviews_count'], name='title_weighted_rating_idx'),
+        ),
+    ]
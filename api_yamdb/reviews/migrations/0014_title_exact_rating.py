@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:55
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Cast, NullIf
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.update(rating=models.ExpressionWrapper(
+        Cast(F('rating_sum'), models.FloatField())
+        / NullIf(F('reviews_count'), 0),
+        output_field=models.FloatField(),
+    ))
+
+
+def clear_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(rating__isnull=True).update(rating=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_similar_title'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.RunPython(fill_rating, clear_rating),
+    ]
@@ -1,8 +1,12 @@
 from api.validators import year_validator
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Count, ExpressionWrapper, F, OuterRef,
+                              Subquery, Sum)
 from django.db.models.constraints import UniqueConstraint
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -65,6 +69,96 @@ class Genre(models.Model):
         return self.name
 
 
+def save_kwargs(instance, counters, kwargs):
+    # Счётчики меняются только через F(): обычное сохранение объекта
+    # не должно затирать их значениями, прочитанными раньше.
+    if not instance._state.adding and kwargs.get('update_fields') is None:
+        kwargs['update_fields'] = [
+            field.name for field in instance._meta.concrete_fields
+            if not field.primary_key and field.name not in counters
+        ]
+    return kwargs
+
+
+def stored_rating(total, count):
+    # Точная средняя оценка: целая часть отдаётся в API, а сортировка
+    # различает 9.0 и 9.9. У произведения без отзывов рейтинг NULL.
+    return ExpressionWrapper(
+        Cast(total, models.FloatField()) / NullIf(count, 0),
+        output_field=models.FloatField(),
+    )
+
+
+# Гистограмма оценок: по счётчику на каждую оценку от 1 до 10.
+SCORES = range(1, 11)
+SCORE_FIELDS = tuple(f'score_{score}_count' for score in SCORES)
+TITLE_COUNTERS = ('rating_sum', 'reviews_count', 'rating', 'weighted_rating',
+                  'rating_low', 'rating_high') + SCORE_FIELDS
+
+
+class TitleQuerySet(models.QuerySet):
+    def add_review_score(self, score, count=1):
+        # count отзывов с оценкой score: 1 при создании, -1 при удалении.
+        field = SCORE_FIELDS[score - SCORES.start]
+        return self.update(
+            rating_sum=F('rating_sum') + score * count,
+            reviews_count=F('reviews_count') + count,
+            rating=stored_rating(
+                F('rating_sum') + score * count, F('reviews_count') + count
+            ),
+            **{field: F(field) + count},
+        )
+
+    def replace_review_score(self, old, new):
+        old_field = SCORE_FIELDS[old - SCORES.start]
+        new_field = SCORE_FIELDS[new - SCORES.start]
+        return self.update(
+            rating_sum=F('rating_sum') + (new - old),
+            rating=stored_rating(
+                F('rating_sum') + (new - old), F('reviews_count')
+            ),
+            **{old_field: F(old_field) - 1, new_field: F(new_field) + 1},
+        )
+
+    def with_actual_rating(self):
+        return self.annotate(**self._actual_rating())
+
+    def refresh_rating(self):
+        actual = self._actual_rating()
+        return self.update(
+            rating_sum=actual['actual_rating_sum'],
+            reviews_count=actual['actual_reviews_count'],
+            rating=stored_rating(
+                actual['actual_rating_sum'], actual['actual_reviews_count']
+            ),
+            **{field: actual[f'actual_{field}'] for field in SCORE_FIELDS},
+        )
+
+    @staticmethod
+    def _actual_rating():
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        actual = {
+            'actual_rating_sum': Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total'),
+                output_field=models.PositiveIntegerField(),
+            ), 0),
+            'actual_reviews_count': Coalesce(Subquery(
+                reviews.annotate(total=Count('pk')).values('total'),
+                output_field=models.PositiveIntegerField(),
+            ), 0),
+        }
+        for score, field in zip(SCORES, SCORE_FIELDS):
+            actual[f'actual_{field}'] = Coalesce(Subquery(
+                reviews.filter(score=score).annotate(
+                    total=Count('pk')
+                ).values('total'),
+                output_field=models.PositiveIntegerField(),
+            ), 0)
+        return actual
+
+
 class Title(models.Model):
     name = models.CharField('Название', max_length=256)
     year = models.PositiveSmallIntegerField(
@@ -80,14 +174,113 @@ class Title(models.Model):
         related_name='category',
         verbose_name='Категория',
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг', null=True, editable=False
+    )
+    # Заполняются командой recompute_weighted_ratings.
+    weighted_rating = models.FloatField(
+        'Взвешенный рейтинг', default=0, editable=False
+    )
+    rating_low = models.FloatField(
+        'Нижняя граница рейтинга', default=0, editable=False
+    )
+    rating_high = models.FloatField(
+        'Верхняя граница рейтинга', default=0, editable=False
+    )
+    # Гистограмма оценок, имена полей перечислены в SCORE_FIELDS.
+    score_1_count = models.PositiveIntegerField(
+        'Оценок 1', default=0, editable=False
+    )
+    score_2_count = models.PositiveIntegerField(
+        'Оценок 2', default=0, editable=False
+    )
+    score_3_count = models.PositiveIntegerField(
+        'Оценок 3', default=0, editable=False
+    )
+    score_4_count = models.PositiveIntegerField(
+        'Оценок 4', default=0, editable=False
+    )
+    score_5_count = models.PositiveIntegerField(
+        'Оценок 5', default=0, editable=False
+    )
+    score_6_count = models.PositiveIntegerField(
+        'Оценок 6', default=0, editable=False
+    )
+    score_7_count = models.PositiveIntegerField(
+        'Оценок 7', default=0, editable=False
+    )
+    score_8_count = models.PositiveIntegerField(
+        'Оценок 8', default=0, editable=False
+    )
+    score_9_count = models.PositiveIntegerField(
+        'Оценок 9', default=0, editable=False
+    )
+    score_10_count = models.PositiveIntegerField(
+        'Оценок 10', default=0, editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx',
+            ),
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(
+                fields=['rating', 'year', 'reviews_count'],
+                name='title_rating_year_idx',
+            ),
+            models.Index(
+                fields=['reviews_count'], name='title_reviews_count_idx',
+            ),
+            models.Index(
+                fields=['weighted_rating', 'reviews_count'],
+                name='title_weighted_rating_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **save_kwargs(self, TITLE_COUNTERS, kwargs))
+
+    @property
+    def score_histogram(self):
+        return [getattr(self, field) for field in SCORE_FIELDS]
+
+
+class ReviewQuerySet(models.QuerySet):
+    def add_comments(self, count):
+        return self.update(comments_count=F('comments_count') + count)
+
+    def with_actual_comments_count(self):
+        return self.annotate(
+            actual_comments_count=self._actual_comments_count()
+        )
+
+    def refresh_comments_count(self):
+        return self.update(comments_count=self._actual_comments_count())
+
+    @staticmethod
+    def _actual_comments_count():
+        comments = Comments.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        return Coalesce(Subquery(
+            comments.annotate(total=Count('pk')).values('total'),
+            output_field=models.PositiveIntegerField(),
+        ), 0)
+
 
 class Review(models.Model):
     text = models.TextField('Название')
@@ -114,6 +307,11 @@ class Review(models.Model):
         related_name='reviews',
         verbose_name='Название',
     )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
@@ -123,12 +321,40 @@ class Review(models.Model):
                 name='constraints_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='review_author_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
     def __str__(self):
         return self.text[:15]
 
+    def locked_rating(self):
+        # Прежние title_id и score читаются под блокировкой строки
+        # внутри транзакции записи: сигналы корректируют сумму оценок
+        # произведения на разницу, и параллельная запись того же отзыва
+        # не должна применить её второй раз. (None, None) — строки нет.
+        if self._state.adding or self.pk is None:
+            return None, None
+        return Review.objects.select_for_update().filter(
+            pk=self.pk
+        ).values_list('title_id', 'score').first() or (None, None)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            self._loaded_rating = self.locked_rating()
+            super().save(*args, **save_kwargs(
+                self, ('comments_count',), kwargs
+            ))
+
 
 class Comments(models.Model):
     text = models.TextField('текст')
@@ -154,6 +380,90 @@ class Comments(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='comment_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_review()
+        return instance
+
+    def remember_review(self):
+        self._loaded_review_id = self.__dict__.get('review_id')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self.remember_review()
+
+
+class SimilarTitle(models.Model):
+    # Заполняется командой build_similar_titles. Соседи произведения
+    # читаются одним проходом по индексу (title, -score).
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_titles',
+        verbose_name='Произведение',
+        db_index=False,
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожее произведение',
+    )
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        ordering = ('title', '-score')
+        indexes = [
+            models.Index(
+                fields=['title', '-score'], name='similar_title_score_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} -> {self.similar_id}: {self.score:.3f}'
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipient = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent_at = models.DateTimeField('Отправлено', blank=True, null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('pk',)
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'next_attempt_at'],
+                name='outgoing_email_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,133 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+# Письмо, взятое в работу, не выдаётся другому обработчику, пока
+# не истечёт аренда.
+LEASE = timedelta(minutes=5)
+
+executor = ThreadPoolExecutor(max_workers=1)
+# В режиме thread повтор письма с ошибкой планируется таймером, а не
+# ждёт следующей регистрации.
+retry_timer = None
+retry_lock = threading.Lock()
+
+
+def enqueue(subject, body, from_email, recipient):
+    email = OutgoingEmail.objects.create(
+        subject=subject, body=body, from_email=from_email,
+        recipient=recipient,
+    )
+    mode = settings.EMAIL_OUTBOX_MODE
+    if mode == 'eager':
+        transaction.on_commit(send_pending)
+    elif mode == 'thread':
+        transaction.on_commit(lambda: executor.submit(send_in_thread))
+    return email
+
+
+def send_in_thread():
+    try:
+        send_pending()
+        schedule_retry()
+    except Exception:
+        logger.exception('Не удалось разослать исходящие письма')
+    finally:
+        connection.close()
+
+
+def schedule_retry():
+    global retry_timer
+    retry = OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    ).aggregate(retry=Min('next_attempt_at'))['retry']
+    with retry_lock:
+        if retry_timer is not None:
+            retry_timer.cancel()
+            retry_timer = None
+        if retry is None:
+            return
+        delay = max((retry - timezone.now()).total_seconds(), 0)
+        retry_timer = threading.Timer(
+            delay, executor.submit, (send_in_thread,)
+        )
+        retry_timer.daemon = True
+        retry_timer.start()
+
+
+def pending():
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=timezone.now(),
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def claim(batch_size):
+    with transaction.atomic():
+        ids = list(pending().select_for_update(skip_locked=True).values_list(
+            'pk', flat=True
+        )[:batch_size])
+        OutgoingEmail.objects.filter(pk__in=ids).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=timezone.now() + LEASE,
+        )
+    return list(OutgoingEmail.objects.filter(pk__in=ids))
+
+
+def retry_at(attempts):
+    return timezone.now() + timedelta(minutes=2 ** attempts)
+
+
+def send_batch(batch_size):
+    emails = claim(batch_size)
+    if not emails:
+        return 0, 0
+    sent = 0
+    with get_connection() as mail_connection:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email,
+                [email.recipient], connection=mail_connection,
+            )
+            # Каждое письмо отмечается сразу: ошибка на следующем не
+            # должна вернуть уже отправленные в очередь. Любое исключение
+            # считается неудачной попыткой этого письма.
+            try:
+                message.send()
+            except Exception as error:
+                logger.warning('Не удалось отправить письмо %s: %s',
+                               email.pk, error)
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    last_error=str(error),
+                    next_attempt_at=retry_at(email.attempts),
+                )
+            else:
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    sent_at=timezone.now(), last_error=''
+                )
+                sent += 1
+    return sent, len(emails) - sent
+
+
+def send_pending(batch_size=None):
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_batch(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
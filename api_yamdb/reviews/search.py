@@ -0,0 +1,158 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+
+# Полнотекстовый индекс хранится в отдельной таблице на каждую модель:
+# FTS5 в SQLite и tsvector с GIN индексом в PostgreSQL. Первая колонка
+# весит больше остальных при ранжировании.
+SEARCH_INDEXES = {
+    'title': ('reviews_title', ('name', 'description')),
+    'review': ('reviews_review', ('text',)),
+}
+SEARCH_LIMIT = 1000
+FIRST_COLUMN_WEIGHT = 10.0
+WEIGHT_LABELS = 'ABCD'
+
+
+def index_table(name):
+    return f'{SEARCH_INDEXES[name][0]}_search'
+
+
+def supported(using=connection):
+    return using.vendor in ('sqlite', 'postgresql')
+
+
+def postgres_document(columns):
+    return ' || '.join(
+        f"setweight(to_tsvector(%s, coalesce({column}, '')), "
+        f"'{WEIGHT_LABELS[number]}')"
+        for number, column in enumerate(columns)
+    )
+
+
+def create_index(name, using=connection):
+    table = index_table(name)
+    _, columns = SEARCH_INDEXES[name]
+    with using.cursor() as cursor:
+        if using.vendor == 'sqlite':
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5('
+                f'{", ".join(columns)}, '
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+        elif using.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} '
+                '(id integer PRIMARY KEY, document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_document_idx '
+                f'ON {table} USING gin (document)'
+            )
+
+
+def drop_index(name, using=connection):
+    if supported(using):
+        with using.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {index_table(name)}')
+
+
+def fill_index(name, pk=None, created=False, using=connection):
+    # Без pk индекс перестраивается целиком, иначе обновляется одна
+    # строка. Документ всегда читается из исходной таблицы.
+    source, columns = SEARCH_INDEXES[name]
+    table = index_table(name)
+    where, params = ('', []) if pk is None else ('WHERE id = %s', [pk])
+    with using.cursor() as cursor:
+        if using.vendor == 'sqlite':
+            if pk is None:
+                cursor.execute(f'DELETE FROM {table}')
+            elif not created:
+                unindex(name, pk, using)
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {", ".join(columns)}) '
+                f'SELECT id, {", ".join(columns)} FROM {source} {where}',
+                params,
+            )
+        elif using.vendor == 'postgresql':
+            if pk is None:
+                cursor.execute(f'DELETE FROM {table}')
+            config = [settings.SEARCH_CONFIG] * len(columns)
+            cursor.execute(
+                f'INSERT INTO {table} (id, document) '
+                f'SELECT id, {postgres_document(columns)} '
+                f'FROM {source} {where} '
+                'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                [*config, *params],
+            )
+
+
+def rebuild(name, using=connection):
+    fill_index(name, using=using)
+
+
+def index(name, pk, created=False):
+    fill_index(name, pk, created)
+
+
+def unindex(name, pk, using=connection):
+    if supported(using):
+        key = 'rowid' if using.vendor == 'sqlite' else 'id'
+        with using.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {index_table(name)} WHERE {key} = %s', [pk]
+            )
+
+
+def sqlite_query(query):
+    # Каждое слово в кавычках, чтобы операторы FTS5 из запроса
+    # не разбирались, и с `*` для поиска по началу слова.
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""'))
+        for word in re.findall(r'\w+', query)
+    )
+
+
+def ranked_ids(name, query, limit=SEARCH_LIMIT):
+    table = index_table(name)
+    _, columns = SEARCH_INDEXES[name]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            query = sqlite_query(query)
+            if not query:
+                return []
+            weights = ', '.join(
+                [str(FIRST_COLUMN_WEIGHT)] + ['1.0'] * (len(columns) - 1)
+            )
+            cursor.execute(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+                f'ORDER BY bm25({table}, {weights}) LIMIT %s',
+                [query, limit],
+            )
+        else:
+            cursor.execute(
+                f'SELECT id FROM {table}, plainto_tsquery(%s, %s) query '
+                'WHERE document @@ query '
+                'ORDER BY ts_rank(document, query) DESC, id LIMIT %s',
+                [settings.SEARCH_CONFIG, query, limit],
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search(queryset, name, query):
+    if not supported():
+        _, columns = SEARCH_INDEXES[name]
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f'{column}__icontains': query})
+        return queryset.filter(condition)
+    ids = ranked_ids(name, query)
+    if not ids:
+        return queryset.none()
+    # Порядок строк повторяет ранжирование индекса.
+    return queryset.filter(pk__in=ids).order_by(Case(
+        *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    ))
@@ -0,0 +1,131 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from reviews import autocomplete, leaderboards, search
+from reviews.models import Category, Comments, Genre, Review, Title
+
+SEARCH_FIELDS = {
+    Title: {'name', 'description'},
+    Review: {'text'},
+}
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    loaded_title_id, loaded_score = getattr(
+        instance, '_loaded_rating', (None, None)
+    )
+    titles = Title.objects.filter(pk=instance.title_id)
+    if created:
+        titles.add_review_score(instance.score)
+    elif loaded_title_id is None:
+        titles.refresh_rating()
+    elif loaded_title_id != instance.title_id:
+        Title.objects.filter(pk=loaded_title_id).add_review_score(
+            loaded_score, -1
+        )
+        titles.add_review_score(instance.score)
+    elif loaded_score != instance.score:
+        titles.replace_review_score(loaded_score, instance.score)
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    # pre_delete отправляется внутри транзакции удаления.
+    instance._loaded_rating = instance.locked_rating()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    loaded_title_id, loaded_score = getattr(
+        instance, '_loaded_rating', (None, None)
+    )
+    if loaded_title_id is None:
+        # Отзыв уже удалён параллельным запросом.
+        return
+    Title.objects.filter(pk=loaded_title_id).add_review_score(
+        loaded_score, -1
+    )
+
+
+@receiver(post_save, sender=Comments)
+def comment_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    loaded_review_id = getattr(instance, '_loaded_review_id', None)
+    reviews = Review.objects.filter(pk=instance.review_id)
+    if created:
+        reviews.add_comments(1)
+    elif loaded_review_id is None:
+        reviews.refresh_comments_count()
+    elif loaded_review_id != instance.review_id:
+        Review.objects.filter(pk=loaded_review_id).add_comments(-1)
+        reviews.add_comments(1)
+
+
+@receiver(post_delete, sender=Comments)
+def comment_deleted(sender, instance, **kwargs):
+    loaded_review_id = getattr(instance, '_loaded_review_id', None)
+    if loaded_review_id is None:
+        Review.objects.filter(
+            pk=instance.review_id
+        ).refresh_comments_count()
+        return
+    Review.objects.filter(pk=loaded_review_id).add_comments(-1)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+def search_document_saved(sender, instance, created, raw, update_fields,
+                          **kwargs):
+    if raw:
+        return
+    if update_fields is None or SEARCH_FIELDS[sender] & set(update_fields):
+        search.index(sender._meta.model_name, instance.pk, created)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+def search_document_deleted(sender, instance, **kwargs):
+    search.unindex(sender._meta.model_name, instance.pk)
+
+
+@receiver(post_save, sender=Title)
+def autocomplete_title_saved(sender, instance, update_fields, **kwargs):
+    if update_fields is None or 'name' in update_fields:
+        transaction.on_commit(autocomplete.invalidate)
+
+
+@receiver(post_delete, sender=Title)
+def autocomplete_title_deleted(sender, instance, **kwargs):
+    transaction.on_commit(autocomplete.invalidate)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def leaderboard_review_changed(sender, instance, **kwargs):
+    title_ids = {instance.title_id}
+    loaded_title_id, _ = getattr(instance, '_loaded_rating', (None, None))
+    if loaded_title_id is not None:
+        title_ids.add(loaded_title_id)
+    for title_id in title_ids:
+        transaction.on_commit(
+            partial(leaderboards.invalidate_title, title_id)
+        )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def leaderboard_catalog_changed(sender, **kwargs):
+    transaction.on_commit(leaderboards.invalidate_all)
@@ -0,0 +1,95 @@
+import heapq
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from reviews.models import Review, SimilarTitle
+
+# Скалярные произведения столбцов матрицы «пользователь × произведение»
+# считаются в БД: самосоединение отзывов по author_id, сгруппированное
+# по паре произведений. Произведения обрабатываются диапазонами id по
+# chunk_size штук, и в памяти держатся только нормы всех произведений
+# и top_k лучших соседей произведений текущего диапазона.
+SIMILARITY_METHODS = ('adjusted', 'cosine')
+CHUNK_SIZE = 2000
+
+# Adjusted cosine: из оценок вычитается средняя оценка пользователя,
+# чтобы строгие и щедрые оценщики не смещали сходство.
+MEAN_JOINS = {
+    'adjusted': (
+        'JOIN (SELECT author_id, AVG(score) AS mean FROM {review} '
+        'GROUP BY author_id) m ON m.author_id = r.author_id',
+        'm.mean',
+    ),
+    'cosine': ('', '0'),
+}
+NORMS_SQL = (
+    'SELECT r.title_id, SUM((r.score - {mean}) * (r.score - {mean})) '
+    'FROM {review} r {join} GROUP BY r.title_id'
+)
+DOTS_SQL = (
+    'SELECT r.title_id, o.title_id, '
+    'SUM((r.score - {mean}) * (o.score - {mean})) '
+    'FROM {review} r JOIN {review} o '
+    'ON o.author_id = r.author_id AND o.title_id <> r.title_id {join} '
+    'WHERE r.title_id BETWEEN %s AND %s '
+    'GROUP BY r.title_id, o.title_id '
+    'HAVING SUM((r.score - {mean}) * (o.score - {mean})) > 0'
+)
+
+
+def query(sql, method):
+    join, mean = MEAN_JOINS[method]
+    review = connection.ops.quote_name(Review._meta.db_table)
+    return sql.format(
+        review=review, mean=mean, join=join.format(review=review)
+    )
+
+
+def title_norms(method='adjusted'):
+    with connection.cursor() as cursor:
+        cursor.execute(query(NORMS_SQL, method))
+        return {
+            title_id: math.sqrt(float(total))
+            for title_id, total in cursor.fetchall()
+        }
+
+
+def neighbours(first_id, last_id, norms, top_k, method='adjusted'):
+    best = defaultdict(list)
+    with connection.cursor() as cursor:
+        cursor.execute(query(DOTS_SQL, method), [first_id, last_id])
+        for title_id, other_id, dot in cursor:
+            if not norms.get(title_id) or not norms.get(other_id):
+                continue
+            item = (float(dot) / (norms[title_id] * norms[other_id]),
+                    other_id)
+            if len(best[title_id]) < top_k:
+                heapq.heappush(best[title_id], item)
+            else:
+                heapq.heappushpop(best[title_id], item)
+    return best
+
+
+def build(method='adjusted', top_k=None, chunk_size=CHUNK_SIZE):
+    top_k = top_k or settings.SIMILAR_TITLES_K
+    norms = title_norms(method)
+    title_ids = sorted(pk for pk, norm in norms.items() if norm)
+    created = 0
+    with transaction.atomic():
+        SimilarTitle.objects.all().delete()
+        for start in range(0, len(title_ids), chunk_size):
+            chunk = title_ids[start:start + chunk_size]
+            batch = [
+                SimilarTitle(title_id=title_id, similar_id=other_id,
+                             score=score)
+                for title_id, heap in neighbours(
+                    chunk[0], chunk[-1], norms, top_k, method
+                ).items()
+                for score, other_id in sorted(heap, reverse=True)
+            ]
+            SimilarTitle.objects.bulk_create(batch)
+            created += len(batch)
+    return created
@@ -0,0 +1,82 @@
+import math
+from array import array
+
+from api.cache import bump_version
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from reviews import leaderboards
+from reviews.models import Review, Title
+
+# Гистограммы оценок считаются в БД группировкой по (title_id, score):
+# в Python приходит не больше десяти строк на произведение, а не
+# каждый отзыв. Дальше по гистограммам считаются средняя, байесовский
+# рейтинг и доверительный интервал, и всё записывается bulk_update.
+SCORES = range(1, 11)
+CHUNK_SIZE = 2000
+Z = 1.96
+WEIGHTED_FIELDS = ('weighted_rating', 'rating_low', 'rating_high')
+
+
+def histograms(chunk_size=CHUNK_SIZE):
+    rows = Review.objects.order_by().values_list(
+        'title_id', 'score'
+    ).annotate(total=Count('pk'))
+    result = {}
+    for title_id, score, total in rows.iterator(chunk_size=chunk_size):
+        if title_id not in result:
+            result[title_id] = array('L', [0]) * len(SCORES)
+        result[title_id][score - SCORES.start] = total
+    return result
+
+
+def prior(result):
+    # Средняя оценка по всем отзывам с весом LEADERBOARD_PRIOR_WEIGHT
+    # или средним числом отзывов у произведения.
+    reviews = sum(sum(counts) for counts in result.values())
+    if not reviews:
+        return 0.0, 0.0
+    score = sum(
+        sum(value * count for value, count in zip(SCORES, counts))
+        for counts in result.values()
+    )
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT or reviews / len(result)
+    return score / reviews, weight
+
+
+def stats(counts, mean_prior, weight):
+    reviews = sum(counts)
+    total = sum(value * count for value, count in zip(SCORES, counts))
+    mean = total / reviews
+    weighted = (total + mean_prior * weight) / (reviews + weight)
+    if reviews < 2:
+        return weighted, float(SCORES[0]), float(SCORES[-1])
+    variance = sum(
+        count * (value - mean) ** 2 for value, count in zip(SCORES, counts)
+    ) / (reviews - 1)
+    margin = Z * math.sqrt(variance / reviews)
+    return (weighted, max(mean - margin, SCORES[0]),
+            min(mean + margin, SCORES[-1]))
+
+
+def recompute(chunk_size=CHUNK_SIZE):
+    result = histograms(chunk_size)
+    mean_prior, weight = prior(result)
+    titles = [
+        Title(pk=pk, **dict(
+            zip(WEIGHTED_FIELDS, stats(counts, mean_prior, weight))
+        ))
+        for pk, counts in result.items()
+    ]
+    with transaction.atomic():
+        Title.objects.exclude(weighted_rating=0).update(
+            **dict.fromkeys(WEIGHTED_FIELDS, 0)
+        )
+        Title.objects.bulk_update(titles, WEIGHTED_FIELDS,
+                                  batch_size=chunk_size)
+    # bulk_update не отправляет сигналы, поэтому версия списка
+    # произведений и байесовские таблицы лидеров сбрасываются здесь.
+    bump_version('reviews.title')
+    leaderboards.invalidate_all()
+    return len(titles)
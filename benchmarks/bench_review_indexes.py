@@ -0,0 +1,192 @@
+"""Планы запросов отзывов и комментариев до и после составных индексов.
+
+Создаёт временную SQLite базу, применяет миграции до 0003 (только
+одноколоночные индексы), заполняет её отзывами и печатает планы и время
+запросов. Затем применяет оставшиеся миграции и повторяет замеры.
+До полной миграции используются исторические модели из состояния
+миграций: текущие модели ссылаются на ещё не созданные колонки.
+
+    python benchmarks/bench_review_indexes.py --reviews 1000000
+"""
+import argparse
+import importlib
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+BEFORE_MIGRATION = '0003_title_rating_totals'
+BATCH_SIZE = 50000
+
+
+def historical_apps(migration):
+    from django.db import connection
+    from django.db.migrations.executor import MigrationExecutor
+
+    loader = MigrationExecutor(connection).loader
+    return loader.project_state(('reviews', migration)).apps
+
+
+def seed(apps, reviews_total, seed_value):
+    from django.db import connection, transaction
+
+    Category, Comments, Review, Title, User = (
+        apps.get_model('reviews', name)
+        for name in ('Category', 'Comments', 'Review', 'Title', 'User')
+    )
+
+    rng = random.Random(seed_value)
+    side = math.ceil(math.sqrt(reviews_total))
+    started = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    adapt = connection.ops.adapt_datetimefield_value
+    with transaction.atomic():
+        Category.objects.bulk_create(
+            Category(name=f'Категория {number}', slug=f'category-{number}')
+            for number in range(20)
+        )
+        categories = list(Category.objects.values_list('pk', flat=True))
+        User.objects.bulk_create(
+            User(username=f'reader{number}',
+                 email=f'reader{number}@yamdb.fake')
+            for number in range(side)
+        )
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', description='',
+                  year=rng.randint(1950, 2020),
+                  category_id=rng.choice(categories))
+            for number in range(side)
+        )
+        users = list(User.objects.values_list('pk', flat=True))
+        titles = list(Title.objects.values_list('pk', flat=True))
+
+        review_sql = (
+            f'INSERT INTO {Review._meta.db_table} '
+            '(text, author_id, score, pub_date, title_id) '
+            'VALUES (%s, %s, %s, %s, %s)'
+        )
+        rows = (
+            ('Отзыв', users[number // side], rng.randint(1, 10),
+             adapt(started + timedelta(seconds=rng.randint(0, 10 ** 8))),
+             titles[number % side])
+            for number in range(reviews_total)
+        )
+        insert_batches(review_sql, rows)
+        # Комментарии сосредоточены на немногих популярных отзывах.
+        last_review = Review.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first()
+        comment_sql = (
+            f'INSERT INTO {Comments._meta.db_table} '
+            '(text, author_id, pub_date, review_id) VALUES (%s, %s, %s, %s)'
+        )
+        rows = (
+            ('Комментарий', rng.choice(users),
+             adapt(started + timedelta(seconds=rng.randint(0, 10 ** 8))),
+             rng.randint(1, max(1, last_review // 1000)))
+            for _ in range(reviews_total // 5)
+        )
+        insert_batches(comment_sql, rows)
+        importlib.import_module(
+            f'reviews.migrations.{BEFORE_MIGRATION}'
+        ).fill_rating_totals(apps, None)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return users, titles, categories
+
+
+def insert_batches(sql, rows):
+    from django.db import connection
+
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+def access_paths(apps, users, titles, categories):
+    Comments, Review, Title = (
+        apps.get_model('reviews', name)
+        for name in ('Comments', 'Review', 'Title')
+    )
+
+    review_id = Review.objects.order_by('pk').values_list(
+        'pk', flat=True
+    ).first()
+    return (
+        ('отзывы произведения', lambda: Review.objects.filter(
+            title_id=titles[len(titles) // 2]
+        ).order_by('-pub_date', '-pk')[:10]),
+        ('комментарии отзыва', lambda: Comments.objects.filter(
+            review_id=review_id
+        ).order_by('-pub_date', '-pk')[:10]),
+        ('отзывы автора', lambda: Review.objects.filter(
+            author_id=users[len(users) // 2]
+        ).order_by('-pub_date')[:10]),
+        ('комментарии автора', lambda: Comments.objects.filter(
+            author_id=users[len(users) // 2]
+        ).order_by('-pub_date')[:10]),
+        ('произведения категории за год', lambda: Title.objects.filter(
+            category_id=categories[0], year__gte=2000, year__lte=2009
+        ).order_by('year')[:10]),
+    )
+
+
+def report(label, paths, repeat):
+    print(f'\n== {label} ==')
+    for name, build in paths:
+        queryset = build()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(build())
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(f'{name}: {timings[len(timings) // 2] * 1000:.2f} мс')
+        for line in queryset.explain().splitlines():
+            print(f'    {line}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    import django
+    from django.apps import apps
+    from django.conf import settings
+    from django.core.management import call_command
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.DATABASES['default']['NAME'] = os.path.join(
+            directory, 'bench.sqlite3'
+        )
+        django.setup()
+        call_command('migrate', 'reviews', BEFORE_MIGRATION, verbosity=0)
+        before = historical_apps(BEFORE_MIGRATION)
+        started = time.perf_counter()
+        seeded = seed(before, args.reviews, args.seed)
+        print(f'Заполнено {args.reviews} отзывов за '
+              f'{time.perf_counter() - started:.1f} с')
+        report('одноколоночные индексы', access_paths(before, *seeded),
+               args.repeat)
+        call_command('migrate', 'reviews', verbosity=0)
+        report('составные индексы', access_paths(apps, *seeded),
+               args.repeat)
+
+
+if __name__ == '__main__':
+    main()
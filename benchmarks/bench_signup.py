@@ -0,0 +1,101 @@
+"""Пропускная способность параллельной регистрации: старый и новый путь.
+
+Старый путь повторяет прежние SignUpSerializer.validate и get_or_create:
+отдельные запросы по username и email и ещё один перед вставкой. Новый
+использует SignUpSerializer: один запрос по Q(username) | Q(email) и
+вставку, которую защищают уникальные поля.
+
+    python benchmarks/bench_signup.py --signups 2000 --threads 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+class QueryCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.total += 1
+        return execute(sql, params, many, context)
+
+
+def legacy_signup(data):
+    from reviews.models import User
+
+    username = data['username']
+    email = data['email']
+    if User.objects.filter(
+        username=username
+    ) and User.objects.get(username=username) != email:
+        raise ValueError('Этот никнайм уже занят')
+    if User.objects.filter(
+        email=email
+    ) and User.objects.get(email=email) != username:
+        raise ValueError('Эта электронная почта уже используется')
+    user, _ = User.objects.get_or_create(username=username, email=email)
+    return user
+
+
+def current_signup(data):
+    from api.serializers import SignUpSerializer
+
+    serializer = SignUpSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+def run(label, signup, signups, threads):
+    from django.db import connection
+
+    counter = QueryCounter()
+
+    def task(number):
+        with connection.execute_wrapper(counter):
+            signup({'username': f'{label}{number}',
+                    'email': f'{label}{number}@yamdb.fake'})
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(task, number)
+                       for number in range(signups)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    print(f'{label}: {signups / elapsed:.0f} регистраций/с, '
+          f'{counter.total / signups:.1f} запросов на регистрацию')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--signups', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.DATABASES['default'].update(
+            NAME=os.path.join(directory, 'bench.sqlite3'),
+            OPTIONS={'timeout': 60},
+        )
+        django.setup()
+        call_command('migrate', verbosity=0)
+        run('legacy', legacy_signup, args.signups, args.threads)
+        run('current', current_signup, args.signups, args.threads)
+
+
+if __name__ == '__main__':
+    main()
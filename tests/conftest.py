@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -34,3 +35,20 @@ assert get_version() < '3.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    from reviews import autocomplete
+
+    cache.clear()
+    autocomplete.reset()
+    yield
+    cache.clear()
+    autocomplete.reset()
+
+
+@pytest.fixture(autouse=True)
+def eager_outbox(settings):
+    settings.EMAIL_OUTBOX_MODE = 'eager'
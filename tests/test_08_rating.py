@@ -0,0 +1,79 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from .common import create_reviews
+
+
+class Test08Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_review_writes(self, admin_client, admin):
+        from reviews.models import Title
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert admin_client.get(title_url).json().get('rating') == 4, (
+            'Проверьте, что `rating` считается по сохранённой сумме оценок'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.reviews_count) == (12, 3), (
+            'Проверьте, что создание отзыва увеличивает сумму оценок '
+            'и число отзывов произведения'
+        )
+
+        admin_client.patch(
+            f'{title_url}reviews/{reviews[0]["id"]}/', data={'score': 8}
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.reviews_count) == (15, 3), (
+            'Проверьте, что изменение оценки корректирует сумму оценок'
+        )
+
+        admin_client.delete(f'{title_url}reviews/{reviews[1]["id"]}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.reviews_count) == (12, 2), (
+            'Проверьте, что удаление отзыва уменьшает сумму оценок '
+            'и число отзывов произведения'
+        )
+        assert admin_client.get(title_url).json().get('rating') == 6
+
+        response = admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json().get('rating') is None, (
+            'Проверьте, что у произведения без отзывов `rating` равен None'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_check_and_rebuild_commands(self, admin_client, admin):
+        from reviews.models import Title
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('check_ratings')
+
+        Title.objects.update(rating_sum=0, reviews_count=0)
+        with pytest.raises(CommandError):
+            call_command('check_ratings')
+
+        call_command('rebuild_ratings')
+        call_command('check_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.reviews_count) == (12, 3), (
+            'Проверьте, что `rebuild_ratings` восстанавливает сумму оценок '
+            'и число отзывов по таблице отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_stale_instances(self, admin_client, admin):
+        from reviews.models import Review
+        reviews, _, _, _ = create_reviews(admin_client, admin)
+        first = Review.objects.get(pk=reviews[0]['id'])
+        second = Review.objects.get(pk=reviews[0]['id'])
+        first.score, second.score = 10, 1
+        first.save()
+        second.save()
+        # check_ratings падает, если счётчики разошлись с отзывами.
+        call_command('check_ratings')
+
+        first = Review.objects.get(pk=reviews[1]['id'])
+        second = Review.objects.get(pk=reviews[1]['id'])
+        first.delete()
+        second.delete()
+        call_command('check_ratings')
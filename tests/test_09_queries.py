@@ -0,0 +1,83 @@
+import pytest
+
+from .common import create_comments, create_titles
+
+
+class Test09Queries:
+
+    def create_more_titles(self, admin_client, genres, categories, count):
+        for number in range(count):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {number}', 'year': 2001,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[number % 2]['slug'],
+                'description': 'Описание',
+            })
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_list_queries(self, client, admin_client,
+                                    django_assert_num_queries):
+        _, categories, genres = create_titles(admin_client)
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?limit=2')
+        assert len(response.json()['results']) == 2
+        self.create_more_titles(admin_client, genres, categories, 10)
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?limit=12')
+        assert len(response.json()['results']) == 12, (
+            'Проверьте, что список произведений загружает жанры и категории '
+            'фиксированным числом запросов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert len(response.json()['genre']) == 2, (
+            'Проверьте, что произведение загружает жанры и категорию '
+            'фиксированным числом запросов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_create_queries(self, admin_client, user_client,
+                                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Премьера', 'score': 9}
+        # пользователь, произведение, BEGIN, вставка отзыва, рейтинг,
+        # строка поискового индекса, жанры для сброса таблиц лидеров
+        with django_assert_num_queries(7):
+            response = user_client.post(url, data=data)
+        assert response.status_code == 201
+        assert response.json()['title'] == titles[0]['name']
+        response = user_client.post(url, data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение '
+            'возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_nested_lists_skip_parent_lookup(
+            self, client, admin_client, admin, django_assert_num_queries):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        comments_url = f'{title_url}reviews/{reviews[0]["id"]}/comments/'
+        for url in (f'{title_url}reviews/', comments_url):
+            with django_assert_num_queries(1):
+                response = client.get(f'{url}?cursor=')
+            assert response.status_code == 200, (
+                f'Проверьте, что GET `{url}` не загружает родительский объект'
+            )
+        other_title = f'/api/v1/titles/{titles[1]["id"]}/'
+        response = client.get(
+            f'{other_title}reviews/{reviews[0]["id"]}/comments/'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что комментарии отзыва другого произведения '
+            'не отдаются'
+        )
+        response = client.get(f'{other_title}reviews/')
+        assert response.status_code == 200
+        assert client.get('/api/v1/titles/999/reviews/').status_code == 404
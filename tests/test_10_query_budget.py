@@ -0,0 +1,140 @@
+import json
+import os
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from api.urls import router, urlpatterns
+
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), 'query_budget.json')
+PAGE_SIZES = (1, 10, 100)
+CATALOG_SIZE = max(PAGE_SIZES) + 10
+
+with open(BUDGET_PATH, encoding='utf-8') as budget_file:
+    BUDGETS = json.load(budget_file)
+
+GET_ROUTES = [
+    pattern for pattern in router.urls
+    if 'get' in getattr(pattern.callback, 'actions', {})
+] + [
+    # Маршруты вне роутера: функции с @api_view, принимающие GET.
+    pattern for pattern in urlpatterns
+    if isinstance(pattern, URLPattern)
+    and hasattr(getattr(pattern.callback, 'cls', None), 'get')
+]
+
+
+def seed_catalog(admin, size=CATALOG_SIZE):
+    from reviews.models import (Category, Comments, Genre, Review, Title,
+                                User)
+    User.objects.bulk_create(
+        User(username=f'reader{number}', email=f'reader{number}@yamdb.fake')
+        for number in range(size)
+    )
+    readers = list(User.objects.filter(username__startswith='reader'))
+    Category.objects.bulk_create(
+        Category(name=f'Категория {number}', slug=f'category-{number}')
+        for number in range(size)
+    )
+    categories = list(Category.objects.all())
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(size)
+    )
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=2000,
+              description='Описание',
+              category=categories[number % len(categories)])
+        for number in range(size)
+    )
+    titles = list(Title.objects.all())
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title=title, genre=genre)
+        for number, title in enumerate(titles)
+        for genre in genres[number % 5:number % 5 + 2]
+    )
+    title = titles[0]
+    Review.objects.bulk_create(
+        Review(title=title, author=reader, text='Отзыв',
+               score=number % 10 + 1)
+        for number, reader in enumerate(readers)
+    )
+    review = Review.objects.filter(title=title).first()
+    Comments.objects.bulk_create(
+        Comments(review=review, author=reader, text='Комментарий')
+        for reader in readers
+    )
+    Title.objects.refresh_rating()
+    Review.objects.refresh_comments_count()
+    return {
+        'title_id': title.pk,
+        'review_id': review.pk,
+        'username': admin.username,
+        'table': 'review',
+        'pk': {
+            'titles': title.pk,
+            'reviews': review.pk,
+            'comments': review.comments.first().pk,
+        },
+    }
+
+
+def route_url(pattern, catalog):
+    basename = pattern.name.rsplit('-', 1)[0]
+    kwargs = {}
+    for group in pattern.pattern.regex.groupindex:
+        if group == 'pk':
+            kwargs[group] = catalog['pk'][basename]
+        else:
+            kwargs[group] = catalog[group]
+    return reverse(f'api:{pattern.name}', kwargs=kwargs)
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+        if response.streaming:
+            # Выгрузка читает БД, пока отдаётся тело ответа.
+            b''.join(response.streaming_content)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+    )
+    return len(context.captured_queries), response
+
+
+@pytest.mark.parametrize(
+    'pattern', GET_ROUTES, ids=[pattern.name for pattern in GET_ROUTES]
+)
+@pytest.mark.django_db
+def test_query_budget(pattern, admin, admin_client):
+    assert pattern.name in BUDGETS, (
+        f'Добавьте бюджет запросов для маршрута `{pattern.name}` '
+        f'в `{os.path.basename(BUDGET_PATH)}`'
+    )
+    budget = BUDGETS[pattern.name]
+    url = route_url(pattern, seed_catalog(admin))
+
+    if not pattern.name.endswith('-list'):
+        queries, _ = count_queries(admin_client, url)
+        assert queries <= budget, (
+            f'GET `{url}` выполняет {queries} запросов, бюджет {budget}'
+        )
+        return
+
+    counts = {}
+    for page_size in PAGE_SIZES:
+        queries, response = count_queries(
+            admin_client, f'{url}?limit={page_size}'
+        )
+        assert len(response.json()['results']) == page_size
+        counts[page_size] = queries
+    assert len(set(counts.values())) == 1, (
+        f'Число запросов GET `{url}` растёт с размером страницы: {counts}'
+    )
+    assert counts[PAGE_SIZES[0]] <= budget, (
+        f'GET `{url}` выполняет {counts[PAGE_SIZES[0]]} запросов, '
+        f'бюджет {budget}'
+    )
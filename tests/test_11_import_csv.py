@@ -0,0 +1,80 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+DATA_PATH = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def csv_rows(name):
+    with open(os.path.join(DATA_PATH, f'{name}.csv'), encoding='utf-8',
+              newline='') as csv_file:
+        return sum(1 for _ in csv.DictReader(csv_file))
+
+
+class Test11ImportCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_static_data(self):
+        from reviews.models import Comments, Review, Title, User
+        call_command('import_csv', batch_size=10)
+        assert User.objects.count() == csv_rows('users')
+        assert Title.objects.count() == csv_rows('titles')
+        assert Title.genre.through.objects.count() == csv_rows('genre_title')
+        assert Review.objects.count() == csv_rows('review')
+        assert Comments.objects.count() == csv_rows('comments')
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что `import_csv` сохраняет `pub_date` из файла'
+        )
+        call_command('check_ratings')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_endpoint(self, admin_client, user_client):
+        call_command('import_csv')
+        response = user_client.get('/api/v1/export/review/')
+        assert response.status_code == 403, (
+            'Проверьте, что выгрузка каталога доступна только администратору'
+        )
+        response = admin_client.get('/api/v1/export/review/')
+        assert response.status_code == 200
+        content = b''.join(response.streaming_content).decode()
+        exported = list(csv.reader(content.splitlines(keepends=True)))
+        with open(os.path.join(DATA_PATH, 'review.csv'), encoding='utf-8',
+                  newline='') as csv_file:
+            source = list(csv.reader(csv_file))
+        assert exported[0] == source[0], (
+            'Проверьте, что выгрузка повторяет колонки static/data'
+        )
+        assert sorted(exported[1:]) == sorted(source[1:])
+
+        response = admin_client.get('/api/v1/export/comments/?type=jsonl')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == csv_rows('comments')
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_import_resets_cache(self, client):
+        from reviews.models import Genre, Title
+        assert client.get('/api/v1/genres/').json()['count'] == 0
+        stderr = StringIO()
+        call_command('import_csv', stderr=stderr)
+        assert 'CACHE_BACKEND' in stderr.getvalue(), (
+            'Проверьте, что `import_csv` предупреждает о кэше внутри процесса'
+        )
+        assert client.get('/api/v1/genres/').json()['count'] == (
+            Genre.objects.count()
+        ), 'Проверьте, что `import_csv` сбрасывает кэш списков'
+
+        title = Title.objects.filter(reviews_count__gt=0).first()
+        url = f'/api/v1/titles/{title.pk}/'
+        Title.objects.filter(pk=title.pk).update(rating_sum=0, rating=0)
+        assert client.get(url).json()['rating'] == 0
+        call_command('rebuild_ratings')
+        assert client.get(url).json()['rating'] == title.rating, (
+            'Проверьте, что `rebuild_ratings` сбрасывает кэш произведений'
+        )
@@ -0,0 +1,54 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test12CursorPagination:
+
+    def collect(self, client, url, direction='next'):
+        texts = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не считается `count`'
+            )
+            texts.extend(item['text'] for item in data['results'])
+            url = data[direction]
+            pages += 1
+        return texts, pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_and_comments_cursor(self, client, admin_client,
+                                            admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+
+        for url, created in ((reviews_url, reviews),
+                             (comments_url, comments)):
+            expected = [item['text'] for item in reversed(created)]
+            texts, pages = self.collect(client, f'{url}?cursor=&limit=2')
+            assert texts == expected, (
+                'Проверьте, что курсорная пагинация отдаёт все записи '
+                'по убыванию `pub_date` без повторов'
+            )
+            assert pages == 2
+
+            last_page = client.get(f'{url}?cursor=&limit=2').json()
+            last_page = client.get(last_page['next']).json()
+            previous = client.get(last_page['previous']).json()
+            assert [item['text'] for item in previous['results']] == (
+                expected[:2]
+            ), 'Проверьте ссылку `previous` курсорной пагинации'
+
+        response = client.get(f'{reviews_url}?cursor=broken')
+        assert response.status_code == 404
+        response = client.get(reviews_url)
+        assert response.json()['count'] == 3, (
+            'Проверьте, что без `cursor` сохраняется пагинация limit/offset'
+        )
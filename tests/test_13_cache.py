@@ -0,0 +1,143 @@
+import pytest
+
+from .common import (create_categories, create_comments, create_genre,
+                     create_reviews, create_titles)
+
+
+class Test13Cache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genre_and_category_lists_cached(
+            self, client, admin_client, django_assert_num_queries):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        for url in ('/api/v1/genres/', '/api/v1/categories/'):
+            first = client.get(f'{url}?search=а&limit=5')
+            with django_assert_num_queries(0):
+                second = client.get(f'{url}?limit=5&search=а')
+            assert second.json() == first.json(), (
+                f'Проверьте, что повторный GET `{url}` отдаётся из кэша'
+            )
+
+        assert client.get('/api/v1/genres/').json()['count'] == 3
+        assert client.get('/api/v1/categories/').json()['count'] == 2
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Мюзикл', 'slug': 'musical'})
+        assert client.get('/api/v1/genres/').json()['count'] == 4, (
+            'Проверьте, что создание жанра сбрасывает кэш списка жанров'
+        )
+        admin_client.delete('/api/v1/categories/films/')
+        assert client.get('/api/v1/categories/').json()['count'] == 1, (
+            'Проверьте, что удаление категории сбрасывает кэш списка категорий'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_cached(self, client, admin_client,
+                                    django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        first = client.get(url).json()
+        with django_assert_num_queries(0):
+            assert client.get(url).json() == first, (
+                f'Проверьте, что повторный GET `{url}` отдаётся из кэша'
+            )
+
+        admin_client.post(f'{url}reviews/', data={'text': 'Ок', 'score': 7})
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения'
+        )
+        admin_client.patch(url, data={'genre': ['drama']})
+        assert [genre['slug'] for genre in client.get(url).json()['genre']] \
+            == ['drama'], (
+                'Проверьте, что смена жанров сбрасывает кэш произведения'
+            )
+        admin_client.delete('/api/v1/categories/films/')
+        assert client.get(url).json()['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кэш произведения'
+        )
+        admin_client.delete(url)
+        assert client.get(url).status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_conditional_get(self, client, admin_client, admin,
+                                django_assert_num_queries):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        urls = (
+            '/api/v1/titles/', title_url, f'{title_url}reviews/', review_url,
+            f'{review_url}comments/', '/api/v1/genres/',
+            '/api/v1/categories/',
+        )
+        etags = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200
+            etags[url] = response['ETag']
+            with django_assert_num_queries(0):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 304, (
+                f'Проверьте, что GET `{url}` с актуальным `If-None-Match` '
+                'возвращает статус 304 без запросов к БД'
+            )
+
+        admin_client.post(f'{review_url}comments/', data={'text': 'Новый'})
+        admin_client.patch(review_url, data={'text': 'Исправлено'})
+        for url in urls[:5]:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, (
+                f'Проверьте, что изменение отзыва меняет ETag `{url}`'
+            )
+        for url in urls[5:]:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 304
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_versions_bumped_after_commit(self):
+        from django.db import transaction
+
+        from api.cache import get_versions
+        from reviews.models import Genre
+        before = get_versions('reviews.genre')
+        with transaction.atomic():
+            Genre.objects.create(name='Мюзикл', slug='musical')
+            assert get_versions('reviews.genre') == before, (
+                'Проверьте, что версия кэша меняется только после коммита'
+            )
+        assert get_versions('reviews.genre') != before
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_review_moved_between_titles(self, admin_client, admin):
+        from api.cache import get_versions, title_name
+        from reviews.models import Review
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        old, new = review.title_id, titles[1]['id']
+        before = get_versions(title_name(old))
+        review.title_id = new
+        review.save()
+        assert get_versions(title_name(old)) != before, (
+            'Проверьте, что перенос отзыва меняет версию кэша '
+            'прежнего произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_author_rename_and_wildcard(self, client, admin_client,
+                                           admin):
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        admin_client.patch(f'/api/v1/users/{user.username}/',
+                           data={'username': 'Renamed'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что переименование автора сбрасывает кэш отзывов'
+        )
+        assert 'Renamed' in {
+            review['author'] for review in response.json()['results']
+        }
+
+        response = client.get('/api/v1/titles/9999/', HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == 404, (
+            'Проверьте, что `If-None-Match: *` не скрывает 404'
+        )
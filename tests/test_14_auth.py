@@ -0,0 +1,47 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def claims_client(user):
+    from api.authentication import token_for_user
+    client = APIClient()
+    token = token_for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+class Test14StatelessAuth:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reads_skip_user_lookup(self, admin,
+                                       django_assert_num_queries):
+        client = claims_client(admin)
+        assert client.get('/api/v1/export/category/').status_code == 200
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/export/category/')
+            b''.join(response.streaming_content)
+        assert response.status_code == 200, (
+            'Проверьте, что чтение с токеном, содержащим роль, '
+            'не загружает пользователя из БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_revokes_claims(self, admin, user):
+        client = claims_client(admin)
+        assert client.get('/api/v1/export/category/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert client.get('/api/v1/export/category/').status_code == 403, (
+            'Проверьте, что смена роли сразу лишает токен прав администратора'
+        )
+        response = claims_client(user).get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что `/api/v1/users/me/` отдаёт профиль из БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_deleted_user_rejected(self, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/titles/').status_code == 200
+        user.delete()
+        assert client.get('/api/v1/titles/').status_code == 401
@@ -0,0 +1,103 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+class Test15Outbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_email(self, client, settings):
+        from reviews.models import OutgoingEmail
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutgoingEmail.objects.get(recipient=data['email'])
+        assert email.sent_at is None
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1 and mail.outbox[0].to == [data['email']]
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_email_retried(self, settings, monkeypatch):
+        from django.utils import timezone
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import enqueue, send_pending
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        enqueue('Тема', 'Текст', 'from@yamdb.fake', 'to@yamdb.fake')
+
+        def broken_send(self, *args, **kwargs):
+            raise OSError('нет соединения')
+
+        monkeypatch.setattr(
+            'django.core.mail.message.EmailMessage.send', broken_send
+        )
+        assert send_pending() == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.last_error == 'нет соединения'
+        assert email.next_attempt_at > timezone.now()
+
+        monkeypatch.undo()
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert send_pending() == (1, 0), (
+            'Проверьте, что письмо с ошибкой отправляется повторно'
+        )
+        assert len(mail.outbox) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_scheduled_in_thread_mode(self, settings, monkeypatch):
+        from reviews import outbox
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        outbox.enqueue('Тема', 'Текст', 'from@yamdb.fake', 'to@yamdb.fake')
+
+        def broken_send(self, *args, **kwargs):
+            raise OSError('нет соединения')
+
+        monkeypatch.setattr(
+            'django.core.mail.message.EmailMessage.send', broken_send
+        )
+        outbox.send_pending()
+        outbox.schedule_retry()
+        timer = outbox.retry_timer
+        assert timer is not None and timer.is_alive(), (
+            'Проверьте, что после ошибки отправки повтор планируется '
+            'без новой регистрации'
+        )
+        timer.cancel()
+        assert 60 < timer.interval <= 120
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_each_email_marked_separately(self, settings, monkeypatch):
+        from django.core.mail.message import EmailMessage
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import enqueue, send_pending
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        enqueue('Тема', 'Текст', 'from@yamdb.fake', 'bad@yamdb.fake')
+        enqueue('Тема', 'Текст', 'from@yamdb.fake', 'good@yamdb.fake')
+        send = EmailMessage.send
+
+        def picky_send(self, *args, **kwargs):
+            if self.to == ['bad@yamdb.fake']:
+                raise ValueError('неверный заголовок')
+            return send(self, *args, **kwargs)
+
+        monkeypatch.setattr(EmailMessage, 'send', picky_send)
+        assert send_pending() == (1, 1), (
+            'Проверьте, что любая ошибка письма считается неудачной '
+            'попыткой и не прерывает пачку'
+        )
+        bad = OutgoingEmail.objects.get(recipient='bad@yamdb.fake')
+        good = OutgoingEmail.objects.get(recipient='good@yamdb.fake')
+        assert bad.sent_at is None and bad.last_error == 'неверный заголовок'
+        assert good.sent_at is not None
+        assert len(mail.outbox) == 1
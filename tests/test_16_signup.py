@@ -0,0 +1,47 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import ValidationError
+
+
+class Test16Signup:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queries(self, client, settings,
+                               django_assert_num_queries):
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        data = {'email': 'fast@yamdb.fake', 'username': 'fast'}
+        # поиск по username/email, BEGIN и вставка пользователя, письмо
+        with django_assert_num_queries(4):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        with django_assert_num_queries(2):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200, (
+            'Проверьте, что повторная регистрация с теми же данными '
+            'отправляет код ещё раз'
+        )
+        assert get_user_model().objects.filter(username='fast').count() == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_concurrent_signup(self):
+        from api.serializers import SignUpSerializer
+        data = {'email': 'race@yamdb.fake', 'username': 'race'}
+        first = SignUpSerializer(data=data)
+        second = SignUpSerializer(data=data)
+        assert first.is_valid() and second.is_valid()
+        user = first.save()
+        assert second.save() == user, (
+            'Проверьте, что параллельная регистрация тех же данных '
+            'возвращает уже созданного пользователя'
+        )
+
+        other = SignUpSerializer(
+            data={'email': 'other@yamdb.fake', 'username': 'racer'}
+        )
+        assert other.is_valid()
+        get_user_model().objects.create(
+            username='racer', email='racer@yamdb.fake'
+        )
+        with pytest.raises(ValidationError):
+            other.save()
@@ -0,0 +1,74 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test17Counts:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_stored_counts(self, client, admin_client, admin):
+        from reviews.models import Review
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        review = Review.objects.get(pk=reviews[0]['id'])
+        expected = review.comments.count()
+        assert review.comments_count == expected, (
+            'Проверьте, что создание комментария увеличивает '
+            '`comments_count` отзыва'
+        )
+
+        for url, count in ((reviews_url, len(reviews)),
+                           (comments_url, expected)):
+            with CaptureQueriesContext(connection) as context:
+                data = client.get(f'{url}?limit=1').json()
+            assert data['count'] == count, (
+                'Проверьте, что `count` берётся из счётчика родителя'
+            )
+            assert not any(
+                'COUNT(' in query['sql'] for query in context.captured_queries
+            ), 'Проверьте, что список отзывов и комментариев не делает COUNT'
+
+        admin_client.delete(f'{comments_url}{comments[0]["id"]}/')
+        review.refresh_from_db()
+        assert review.comments_count == expected - 1, (
+            'Проверьте, что удаление комментария уменьшает `comments_count`'
+        )
+
+        Review.objects.update(comments_count=0)
+        with pytest.raises(CommandError):
+            call_command('check_ratings')
+        call_command('rebuild_ratings')
+        call_command('check_ratings')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_count_modes(self, client, admin_client, admin):
+        from reviews.models import Title
+        create_comments(admin_client, admin)
+        total = Title.objects.count()
+
+        data = client.get('/api/v1/titles/?limit=1&count=false').json()
+        assert 'count' not in data, (
+            'Проверьте, что с `count=false` ответ не содержит `count`'
+        )
+        assert len(data['results']) == 1 and data['next'], (
+            'Проверьте, что с `count=false` ссылка `next` строится '
+            'по лишней строке выборки'
+        )
+        data = client.get(f'/api/v1/titles/?offset={total - 1}&count=false')
+        assert data.json()['next'] is None
+
+        assert client.get(
+            '/api/v1/titles/?count=approx'
+        ).json()['count'] == total
+        Title.objects.filter(pk=Title.objects.first().pk).delete()
+        assert client.get(
+            '/api/v1/titles/?count=approx&limit=5'
+        ).json()['count'] == total, (
+            'Проверьте, что с `count=approx` число берётся из кэша'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == total - 1
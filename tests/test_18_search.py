@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test18Search:
+
+    def names(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return [item['name'] for item in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_search(self, client, admin_client):
+        from .common import create_titles
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Драма', 'year': 2010, 'description': 'Проект',
+            'genre': [titles[0]['genre'][0]], 'category': titles[0]['category']
+        })
+
+        assert self.names(client, '/api/v1/titles/?search=драма') == [
+            'Драма', 'Проект'
+        ], (
+            'Проверьте, что `search` ищет по названию и описанию и выше '
+            'ставит совпадения в названии'
+        )
+        assert self.names(client, '/api/v1/titles/?search=пов') == [
+            'Поворот туда'
+        ], 'Проверьте, что `search` находит слова по началу'
+        assert self.names(client, '/api/v1/titles/?search="OR*') == []
+
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/',
+                           data={'name': 'Сериал', 'description': 'Новый'})
+        assert self.names(client, '/api/v1/titles/?search=проект') == [
+            'Драма'
+        ], 'Проверьте, что изменение произведения обновляет индекс'
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.names(client, '/api/v1/titles/?search=поворот') == [], (
+            'Проверьте, что удалённое произведение пропадает из поиска'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_search(self, client, admin_client, admin):
+        from reviews.models import Title
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = '/api/v1/reviews/?search=qwerty321'
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [
+            reviews[2]['id']
+        ], 'Проверьте, что `/api/v1/reviews/` ищет по тексту отзывов'
+        assert data['results'][0]['title_id'] == titles[0]['id']
+
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        assert client.get(url).json()['results'] == []
+
+        call_command('rebuild_search')
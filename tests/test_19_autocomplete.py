@@ -0,0 +1,55 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test19Autocomplete:
+
+    def suggest(self, client, prefix):
+        response = client.get(f'/api/v1/titles/autocomplete/?q={prefix}')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/autocomplete/` '
+            'возвращает статус 200'
+        )
+        return [item['name'] for item in response.json()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_prefix_index(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        assert self.suggest(client, 'пОв') == ['Поворот туда'], (
+            'Проверьте, что подсказки не зависят от регистра'
+        )
+        with django_assert_num_queries(0):
+            assert self.suggest(client, 'туд') == ['Поворот туда'], (
+                'Проверьте, что подсказки ищут по началу каждого слова '
+                'и не обращаются к БД после загрузки индекса'
+            )
+        assert self.suggest(client, 'ворот') == []
+        assert self.suggest(client, '') == []
+
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/',
+                           data={'name': 'Поворот обратно'})
+        assert self.suggest(client, 'поворот') == [
+            'Поворот обратно', 'Поворот туда'
+        ], 'Проверьте, что изменение названия обновляет индекс'
+        assert self.suggest(client, 'проект') == []
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.suggest(client, 'поворот') == ['Поворот обратно'], (
+            'Проверьте, что удалённое произведение пропадает из подсказок'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reload_on_shared_version(self, client, admin_client):
+        from reviews import autocomplete
+        from reviews.models import Title
+        titles, _, _ = create_titles(admin_client)
+        assert self.suggest(client, 'проект') == ['Проект']
+        # Другой процесс переименовал произведение: локальный индекс
+        # не менялся, изменилась только версия в общем кэше.
+        Title.objects.filter(pk=titles[1]['id']).update(name='Прожект')
+        autocomplete.invalidate()
+        assert self.suggest(client, 'про') == ['Прожект'], (
+            'Проверьте, что индекс перечитывается при смене версии в кэше'
+        )
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test20TitleFilters:
+
+    def names(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `/api/v1/titles/?{query}` '
+            'возвращает статус 200'
+        )
+        return sorted(item['name'] for item in response.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_multi_value_and_range(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        first, second = titles[0]['name'], titles[1]['name']
+        genres = titles[0]['genre'] + titles[1]['genre']
+
+        with CaptureQueriesContext(connection) as context:
+            names = self.names(client, f'genre={",".join(genres)}')
+        assert names == sorted([first, second]), (
+            'Проверьте, что `genre` принимает список slug через запятую '
+            'и не повторяет произведение с несколькими жанрами'
+        )
+        assert not any(
+            'DISTINCT' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что фильтр по жанрам обходится без DISTINCT'
+
+        categories = f'{titles[0]["category"]},{titles[1]["category"]}'
+        assert self.names(client, f'category={categories}') == sorted(
+            [first, second]
+        ), 'Проверьте, что `category` принимает список slug через запятую'
+        assert self.names(
+            client, f'category={titles[1]["category"]}&genre={genres[0]}'
+        ) == []
+
+        assert self.names(client, 'year_min=2010') == [second]
+        assert self.names(client, 'year_max=2010') == [first]
+        assert self.names(client, 'year_min=2000&year_max=2020') == sorted(
+            [first, second]
+        ), 'Проверьте, что `year_min` и `year_max` задают диапазон годов'
+
+        assert self.names(client, 'rating_min=4') == [first], (
+            'Проверьте, что `rating_min` отбирает произведения с рейтингом '
+            'не ниже заданного и пропускает произведения без отзывов'
+        )
+        assert self.names(client, 'rating_min=4.5') == []
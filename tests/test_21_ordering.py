@@ -0,0 +1,88 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test21Ordering:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_order_by_stored_columns(self, client, admin_client, admin):
+        from reviews.models import Title
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+                          data={'text': 'Шедевр', 'score': 9})
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.rating == 4, (
+            'Проверьте, что отзывы обновляют сохранённый `rating`'
+        )
+
+        def ids(ordering):
+            response = client.get(f'/api/v1/titles/?ordering={ordering}')
+            assert response.status_code == 200
+            return [item['id'] for item in response.json()['results']]
+
+        first, second = titles[0]['id'], titles[1]['id']
+        assert ids('-rating') == [second, first], (
+            'Проверьте, что `ordering=-rating` сортирует по рейтингу'
+        )
+        assert ids('-reviews_count') == [first, second]
+        assert ids('-year,-rating') == [second, first]
+
+        admin_client.delete(
+            f'/api/v1/titles/{first}/reviews/{reviews[1]["id"]}/'
+        )
+        title.refresh_from_db()
+        assert title.rating == 4.5, (
+            'Проверьте, что `rating` хранит точную среднюю оценку'
+        )
+        Title.objects.update(rating=0)
+        call_command('rebuild_ratings')
+        call_command('check_ratings')
+        title.refresh_from_db()
+        assert title.rating == 4.5, (
+            'Проверьте, что `rebuild_ratings` восстанавливает `rating`'
+        )
+        response = client.get(f'/api/v1/titles/{first}/')
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что API отдаёт целую часть средней оценки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_unrated_titles(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        results = response.json()['results']
+        assert [item['rating'] for item in results] == [4, None], (
+            'Проверьте, что произведения без отзывов идут в конце '
+            'и возвращают `rating` равный null'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_exact_average_and_nulls_last(self, client, admin_client,
+                                             admin):
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        # 4.5 у второго произведения против 4.0 у первого: целая часть
+        # одинакова, но сортировка их различает.
+        for reviewer, score in ((admin_client, 4), (auth_client(user), 5)):
+            reviewer.post(f'/api/v1/titles/{second}/reviews/',
+                          data={'text': 'Отзыв', 'score': score})
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Без отзывов', 'year': 2001, 'description': 'Пусто',
+            'genre': [titles[0]['genre'][0]], 'category': titles[0]['category']
+        })
+        third = response.json()['id']
+
+        def ids(ordering):
+            response = client.get(f'/api/v1/titles/?ordering={ordering}')
+            return [item['id'] for item in response.json()['results']]
+
+        assert ids('-rating')[:2] == [second, first], (
+            'Проверьте, что сортировка по `rating` различает 4.0 и 4.5'
+        )
+        assert ids('rating') == [first, second, third], (
+            'Проверьте, что произведения без отзывов идут последними '
+            'и при сортировке по возрастанию'
+        )
+        assert ids('-rating')[-1] == third
@@ -0,0 +1,79 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test22Leaderboards:
+
+    def ids(self, client, query=''):
+        response = client.get(f'/api/v1/titles/top/?{query}')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/top/` '
+            'возвращает статус 200'
+        )
+        return [item['id'] for item in response.json()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top_titles(self, client, admin_client, admin, settings,
+                           django_assert_num_queries):
+        settings.LEADERBOARD_PRIOR_WEIGHT = 5
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Провал', 'year': 2001, 'description': 'Скучно',
+            'genre': [titles[0]['genre'][0]], 'category': titles[0]['category']
+        })
+        third = response.json()['id']
+        for review in reviews:
+            admin_client.patch(
+                f'/api/v1/titles/{first}/reviews/{review["id"]}/',
+                data={'score': 9}
+            )
+        admin_client.post(f'/api/v1/titles/{second}/reviews/',
+                          data={'text': 'Шедевр', 'score': 10})
+        response = admin_client.post(f'/api/v1/titles/{third}/reviews/',
+                                     data={'text': 'Провал', 'score': 1})
+        third_review = response.json()['id']
+
+        assert self.ids(client) == [second, first, third], (
+            'Проверьте, что `/api/v1/titles/top/` сортирует по рейтингу'
+        )
+        with django_assert_num_queries(2):
+            self.ids(client)
+        call_command('recompute_weighted_ratings', stderr=StringIO())
+        assert self.ids(client, 'bayesian=true') == [first, second, third], (
+            'Проверьте, что байесовская таблица сортируется по '
+            '`weighted_rating` и поднимает произведения с большим числом '
+            'отзывов'
+        )
+        assert self.ids(
+            client, f'genre={titles[0]["genre"][0]}'
+        ) == [first, third], 'Проверьте таблицу лидеров по жанру'
+        assert self.ids(
+            client, f'category={titles[1]["category"]}'
+        ) == [second], 'Проверьте таблицу лидеров по категории'
+
+        admin_client.patch(
+            f'/api/v1/titles/{third}/reviews/{third_review}/',
+            data={'score': 10}
+        )
+        assert self.ids(client, f'genre={titles[0]["genre"][0]}') == [
+            third, first
+        ], 'Проверьте, что запись отзыва сбрасывает таблицы его произведения'
+        admin_client.delete(f'/api/v1/titles/{first}/')
+        assert self.ids(client) == [third, second], (
+            'Проверьте, что таблицы лидеров обновляются после изменений'
+        )
+
+        call_command('recompute_weighted_ratings', stderr=StringIO())
+        stderr = StringIO()
+        call_command('rebuild_leaderboards', stderr=stderr)
+        assert 'CACHE_BACKEND' in stderr.getvalue(), (
+            'Проверьте, что `rebuild_leaderboards` предупреждает '
+            'о кэше внутри процесса'
+        )
+        with django_assert_num_queries(2):
+            assert self.ids(client, 'bayesian=1') == [third, second]
@@ -0,0 +1,47 @@
+import math
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test23WeightedRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_recompute_weighted_ratings(self, client, admin_client, admin):
+        from reviews.models import Title
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        admin_client.post(f'/api/v1/titles/{second}/reviews/',
+                          data={'text': 'Шедевр', 'score': 10})
+        assert client.get(
+            '/api/v1/titles/?ordering=-weighted_rating'
+        ).status_code == 200
+
+        call_command('recompute_weighted_ratings', chunk_size=1)
+        title = Title.objects.get(pk=first)
+        margin = 1.96 * math.sqrt(1 / 3)
+        assert title.weighted_rating == pytest.approx(4.6), (
+            'Проверьте, что взвешенный рейтинг тянется к средней оценке '
+            'всех отзывов с весом среднего числа отзывов'
+        )
+        assert (title.rating_low, title.rating_high) == (
+            pytest.approx(4 - margin), pytest.approx(4 + margin)
+        ), 'Проверьте доверительный интервал средней оценки'
+        title = Title.objects.get(pk=second)
+        assert title.weighted_rating == pytest.approx(7.0)
+        assert (title.rating_low, title.rating_high) == (1, 10), (
+            'Проверьте, что для одного отзыва интервал занимает всю шкалу'
+        )
+
+        response = client.get('/api/v1/titles/?ordering=-weighted_rating')
+        assert [item['id'] for item in response.json()['results']] == [
+            second, first
+        ], 'Проверьте сортировку по `weighted_rating`'
+
+        Title.objects.filter(pk=second).delete()
+        call_command('recompute_weighted_ratings')
+        assert Title.objects.get(pk=first).weighted_rating == (
+            pytest.approx(4.0)
+        )
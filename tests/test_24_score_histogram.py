@@ -0,0 +1,44 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from .common import create_reviews
+
+
+class Test24ScoreHistogram:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_histogram_follows_review_writes(self, client, admin_client,
+                                                admin):
+        from reviews.models import Title
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        expected = [0, 0, 1, 1, 1, 0, 0, 0, 0, 0]
+        assert client.get(title_url).json().get('score_histogram') == (
+            expected
+        ), (
+            'Проверьте, что `score_histogram` содержит число отзывов '
+            'с каждой оценкой от 1 до 10'
+        )
+
+        admin_client.patch(f'{title_url}reviews/{reviews[0]["id"]}/',
+                           data={'score': 10})
+        admin_client.delete(f'{title_url}reviews/{reviews[1]["id"]}/')
+        expected = [0, 0, 0, 1, 0, 0, 0, 0, 0, 1]
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.score_histogram == expected, (
+            'Проверьте, что изменение и удаление отзыва обновляют гистограмму'
+        )
+        assert client.get(title_url).json()['score_histogram'] == expected
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][1]['score_histogram'] == [0] * 10
+
+        Title.objects.update(score_4_count=0)
+        with pytest.raises(CommandError):
+            call_command('check_ratings')
+        call_command('rebuild_ratings')
+        call_command('check_ratings')
+        title.refresh_from_db()
+        assert title.score_histogram == expected, (
+            'Проверьте, что `rebuild_ratings` восстанавливает гистограмму'
+        )
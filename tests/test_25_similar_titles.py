@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test25SimilarTitles:
+
+    def ids(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/similar/')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/{title_id}/similar/` '
+            'возвращает статус 200'
+        )
+        return [item['id'] for item in response.json()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_build_and_serve(self, client, admin_client, admin,
+                                django_assert_num_queries):
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Провал', 'year': 2001, 'description': 'Скучно',
+            'genre': [titles[0]['genre'][0]], 'category': titles[0]['category']
+        })
+        third = response.json()['id']
+        admin_client.post(f'/api/v1/titles/{second}/reviews/',
+                          data={'text': 'Шедевр', 'score': 9})
+        admin_client.post(f'/api/v1/titles/{third}/reviews/',
+                          data={'text': 'Провал', 'score': 2})
+        auth_client(user).post(f'/api/v1/titles/{second}/reviews/',
+                               data={'text': 'Хорошо', 'score': 8})
+        assert self.ids(client, first) == []
+
+        call_command('build_similar_titles', method='cosine')
+        assert self.ids(client, first) == [second, third], (
+            'Проверьте, что похожие произведения отсортированы '
+            'по косинусному сходству оценок'
+        )
+        assert self.ids(client, third) == [second, first]
+        with django_assert_num_queries(2):
+            self.ids(client, second)
+
+        call_command('build_similar_titles', top_k=1)
+        assert self.ids(client, first) == [third], (
+            'Проверьте, что adjusted cosine вычитает среднюю оценку '
+            'пользователя и оставляет не больше `top_k` соседей'
+        )
+        assert self.ids(client, second) == []
+        response = client.get('/api/v1/titles/0/similar/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего произведения '
+            'возвращается статус 404'
+        )
+        response = client.get('/api/v1/titles/abc/similar/')
+        assert response.status_code == 404, (
+            'Проверьте, что для нечислового id произведения '
+            'возвращается статус 404'
+        )